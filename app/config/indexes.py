@@ -0,0 +1,169 @@
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+from app.config.db import *
+
+logger = logging.getLogger("app.indexes")
+
+# Duplicate key values logged when a unique index cannot be built
+MAX_REPORTED_DUPLICATES = 20
+
+# Indexes every collection is expected to have. Names are fixed so that
+# changing a definition fails loudly instead of creating a duplicate index.
+INDEXES = {
+    student_collection: [
+        IndexModel([("student_id", ASCENDING)], name="student_id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel(
+            [("basic_details.branch", ASCENDING), ("_id", ASCENDING)],
+            name="branch_id",
+        ),
+        IndexModel([("is_verified", ASCENDING)], name="is_verified"),
+        IndexModel(
+            [
+                ("academic_summary.total_backlogs", ASCENDING),
+                ("academic_summary.average_cgpa", DESCENDING),
+            ],
+            name="backlogs_average_cgpa",
+        ),
+        IndexModel(
+            [("academic_summary.average_cgpa", DESCENDING), ("_id", ASCENDING)],
+            name="average_cgpa_id",
+        ),
+    ],
+    admin_collection: [
+        IndexModel(
+            [("admin_email", ASCENDING)], name="admin_email_unique", unique=True
+        ),
+    ],
+    notifications_collection: [
+        IndexModel(
+            [
+                ("student_id", ASCENDING),
+                ("timestamp", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="student_id_timestamp_id",
+        ),
+    ],
+    notification_reads_collection: [
+        IndexModel([("student_id", ASCENDING)], name="student_id_unique", unique=True),
+    ],
+    companies_collection: [
+        IndexModel(
+            [("status", ASCENDING), ("recruitmentDate", ASCENDING)],
+            name="status_recruitment_date",
+        ),
+        IndexModel(
+            [
+                ("eligibility.minScore", ASCENDING),
+                ("eligibility.backlogsAllowed", ASCENDING),
+            ],
+            name="eligibility",
+        ),
+    ],
+}
+
+# Representative filters issued by the routers, used to check query plans
+ROUTER_QUERIES = [
+    (student_collection, {"student_id": "SSGI20000000"}),
+    (student_collection, {"email": "student@example.com"}),
+    (student_collection, {"basic_details.branch": "CSE"}),
+    (student_collection, {"is_verified": True}),
+    (
+        student_collection,
+        {
+            "academic_summary.total_backlogs": {"$lte": 0},
+            "academic_summary.average_cgpa": {"$gte": 7},
+        },
+    ),
+    (admin_collection, {"admin_email": "admin@example.com"}),
+    (notifications_collection, {"student_id": {"$in": ["SSGI20000000", "all"]}}),
+    (notification_reads_collection, {"student_id": {"$in": ["SSGI20000000", "all"]}}),
+    (companies_collection, {"status": "Upcoming"}),
+    (
+        companies_collection,
+        {
+            "eligibility.minScore": {"$lte": 7},
+            "eligibility.backlogsAllowed": {"$gte": 0},
+        },
+    ),
+]
+
+
+async def find_duplicate_keys(collection, fields: list) -> list:
+    """
+    Key values shared by more than one document, i.e. the values that keep a
+    unique index on `fields` from being built.
+
+    Returns:
+        list: Up to MAX_REPORTED_DUPLICATES {"key": ..., "count": ...} dicts.
+    """
+    pipeline = [
+        {"$group": {"_id": {f: f"${f}" for f in fields}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": MAX_REPORTED_DUPLICATES},
+    ]
+    return [
+        {"key": group["_id"], "count": group["count"]}
+        async for group in await collection.aggregate(pipeline)
+    ]
+
+
+async def ensure_indexes() -> list:
+    """
+    Create the declared indexes. create_indexes is a no-op for indexes that
+    already exist, so this is safe to run on every startup.
+
+    A unique index that existing data violates is skipped and the duplicate
+    keys are logged, so the app still starts; other indexes are created as
+    usual. Remove the duplicates and restart to build it.
+
+    Returns:
+        list: (collection name, index name) pairs that could not be built.
+    """
+    skipped = []
+    for collection, indexes in INDEXES.items():
+        # One index per call, so one violated unique index does not abort the rest
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+            except DuplicateKeyError:
+                fields = list(index.document["key"])
+                duplicates = await find_duplicate_keys(collection, fields)
+                logger.error(
+                    "Unique index %s on %s not built, existing documents share "
+                    "these keys: %s",
+                    index.document["name"],
+                    collection.name,
+                    duplicates,
+                )
+                skipped.append((collection.name, index.document["name"]))
+    return skipped
+
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def find_collection_scans() -> list:
+    """
+    Explain every query in ROUTER_QUERIES and report the ones whose winning
+    plan falls back to a collection scan.
+
+    Returns:
+        list: (collection name, filter) pairs that use COLLSCAN.
+    """
+    collection_scans = []
+    for collection, query in ROUTER_QUERIES:
+        explanation = await collection.find(query).explain()
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            collection_scans.append((collection.name, query))
+    return collection_scans
@@ -0,0 +1,14 @@
+import os
+
+
+def required_setting(name: str) -> str:
+    """
+    Read a setting that has no safe default, such as a credential.
+
+    Raises:
+        RuntimeError: If the environment variable is unset or empty.
+    """
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"{name} must be set")
+    return value
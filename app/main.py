@@ -1,12 +1,46 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.router.pms_router import *
 from app.router.admin_router import *
 from app.router.company_router import *
+from app.router.storage_router import *
+from app.router.auth_router import *
+from app.router.health_router import *
+from app.config.db import close_database, connect_database
+from app.config.indexes import ensure_indexes
+from app.services.admin_accounts import bootstrap_admin
+from app.services.notification_hub import notification_hub
+from app.services.metrics import MetricsMiddleware
+from app.services.compression import CompressionMiddleware
+from app.services.rate_limit import UploadLimitMiddleware
+from app.services.serialization import AppJSONResponse
 
 # from app.routes.admin_router import *
 
-app = FastAPI(title="Placement Management System", docs_url="/api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_database()
+    await ensure_indexes()
+    await bootstrap_admin()
+    await notification_hub.start()
+    yield
+    await notification_hub.stop()
+    await close_database()
+
+
+app = FastAPI(
+    title="Placement Management System",
+    docs_url="/api",
+    lifespan=lifespan,
+    default_response_class=AppJSONResponse,
+)
+# Innermost, so its rejections still get CORS and metrics
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths=["/upload-marksheets", "/companies/{company_id}/logo"],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -14,8 +48,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(pms_route)
 app.include_router(adminRouter, tags=["Admin Collection"])
 app.include_router(companyRoute, tags=["Company Collection"])
+app.include_router(storageRoute, tags=["Storage"])
+app.include_router(authRoute, tags=["Auth"])
+app.include_router(healthRoute, tags=["Health"])
 # app.include_router(admin_route)
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+# Authenticated caller decoded from an access token
+class Principal(BaseModel):
+    subject: str
+    role: str  # "student" or "admin"
+    claims: dict
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
@@ -19,3 +19,9 @@ class CompanyDetails(BaseModel):
     status: str
     eligibility: Eligibility
     additionalInfo: Optional[str]
+
+
+# Confirmation of a file uploaded directly to storage
+class ConfirmUpload(BaseModel):
+    upload_token: str
+    url: str
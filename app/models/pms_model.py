@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 
@@ -60,38 +60,48 @@ class StudentDetails(BaseModel):
 
 
 class UpdateBasicDetails(BaseModel):
-    full_name: Optional[str]
-    father_name: Optional[str]
-    mother_name: Optional[str]
-    date_of_birth: Optional[str]
-    branch: Optional[str]
+    full_name: Optional[str] = None
+    father_name: Optional[str] = None
+    mother_name: Optional[str] = None
+    date_of_birth: Optional[str] = None
+    branch: Optional[str] = None
 
 
 class UpdateTenthDetails(BaseModel):
-    school_location: Optional[str]
-    percentage: Optional[float]
-    board: Optional[str]
-    marksheet_url: Optional[str]
-    year_of_passing: Optional[int]
+    school_location: Optional[str] = None
+    percentage: Optional[float] = None
+    board: Optional[str] = None
+    marksheet_url: Optional[str] = None
+    year_of_passing: Optional[int] = None
 
 
 class UpdateTwelfthDetails(BaseModel):
-    school_location: Optional[str]
-    percentage: Optional[float]
-    board: Optional[str]
-    marksheet_url: Optional[str]
-    year_of_passing: Optional[int]
+    school_location: Optional[str] = None
+    percentage: Optional[float] = None
+    board: Optional[str] = None
+    marksheet_url: Optional[str] = None
+    year_of_passing: Optional[int] = None
 
 
 class UpdateSemesterDetails(BaseModel):
-    semester: Optional[int]
-    cgpa: Optional[float]
-    no_backlogs: Optional[int]
-    marksheet_url: Optional[str]
+    # Also names the arrayFilters identifier, e.g. $[sem3]
+    semester: Optional[int] = Field(default=None, ge=1)
+    cgpa: Optional[float] = None
+    no_backlogs: Optional[int] = None
+    marksheet_url: Optional[str] = None
 
 
 class UpdateProfile(BaseModel):
-    basic_details: Optional[UpdateBasicDetails]
-    tenth_details: Optional[UpdateTenthDetails]
-    twelfth_details: Optional[UpdateTwelfthDetails]
-    semester_details: Optional[List[UpdateSemesterDetails]]
+    basic_details: Optional[UpdateBasicDetails] = None
+    tenth_details: Optional[UpdateTenthDetails] = None
+    twelfth_details: Optional[UpdateTwelfthDetails] = None
+    semester_details: Optional[List[UpdateSemesterDetails]] = None
+
+
+# Confirmation of a marksheet uploaded directly to storage
+class ConfirmMarksheet(BaseModel):
+    student_id: str
+    marksheet: str  # "tenth", "twelfth" or "semester"
+    semester: Optional[int] = None
+    upload_token: str
+    url: str
@@ -1,50 +1,49 @@
-from fastapi import APIRouter, HTTPException, Body
+import asyncio
+from fastapi import APIRouter, HTTPException, Body, Query, Depends, Request
+from fastapi.responses import Response, StreamingResponse
 from app.config.db import *
 from app.models.admin_model import *
-from bson import ObjectId  # Import password utilities
-from passlib.context import CryptContext
-import jwt  # Import for generating tokens
-from datetime import datetime, timedelta
-from typing import Optional
-
-# Initialize the CryptContext with bcrypt hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    """
-    Hashes a plain-text password.
-
-    Args:
-        password (str): Plain-text password.
-
-    Returns:
-        str: Hashed password.
-    """
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verifies a plain-text password against its hashed version.
-
-    Args:
-        plain_password (str): Plain-text password.
-        hashed_password (str): Hashed password.
-
-    Returns:
-        bool: True if passwords match, False otherwise.
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
+from bson import ObjectId
+from pymongo import ReturnDocument
+from datetime import datetime
+from typing import Literal, Optional
+from app.services.password_service import verify_password
+from app.services.admin_accounts import create_admin
+from app.services.notification_hub import notification_hub
+from app.services.eligibility import rebuild_academic_summaries
+from app.services.analytics import student_analytics
+from app.services.student_import import StudentImport
+from app.services.serialization import AppJSONResponse, serialize_response
+from app.services.student_export import EXPORT_MEDIA_TYPES, stream_students
+from app.services.auth import issue_tokens, require_admin, revoke_tokens
+from app.services.profile_cache import (
+    profile_cache,
+    profile_key,
+    invalidate_profile,
+)
+from app.services.token_cache import student_token_cache
+from app.services.rate_limit import (
+    auth_concurrency_limit,
+    auth_rate_limit,
+    check_failed_logins,
+    record_failed_login,
+)
 
 adminRouter = APIRouter()
 
 
-@adminRouter.post("/admin-register")
+@adminRouter.post(
+    "/admin-register",
+    dependencies=[
+        Depends(require_admin),
+        Depends(auth_rate_limit),
+        Depends(auth_concurrency_limit),
+    ],
+)
 async def admin_register(admin_details: AdminDetails):
     """
-    Registers a new admin.
+    Registers a new admin. Only an existing admin may do this; the first
+    admin is created at startup from the BOOTSTRAP_ADMIN_* settings.
 
     Args:
         admin_details (AdminDetails): Contains admin details like name, email, contact, and password.
@@ -55,56 +54,14 @@ async def admin_register(admin_details: AdminDetails):
     Raises:
         HTTPException: If email already exists, phone number is invalid, or password is too short.
     """
-    # Check if the email is already in use
-    admin_present = admin_collection.find_one({"email": admin_details.admin_email})
-    if admin_present:
-        raise HTTPException(status_code=409, detail="Email already exists")
-
-    # Validate contact number and password length
-    if len(str(admin_details.admin_contact)) != 10:
-        raise HTTPException(status_code=400, detail="Phone number must be 10 digits")
-    if len(admin_details.admin_password) < 7:
-        raise HTTPException(
-            status_code=400, detail="Password must be at least 7 characters long"
-        )
-
-    # Hash the password before storing
-    hashed_password = hash_password(admin_details.admin_password)
-    admin_details_dict = dict(admin_details)
-    admin_details_dict["admin_password"] = hashed_password
-
-    # Insert into the database
-    inserted_id = admin_collection.insert_one(admin_details_dict).inserted_id
-    return {"message": "Admin registered successfully", "admin_id": str(inserted_id)}
-
-
-# Secret key and algorithm for JWT
-SECRET_KEY = "rohitsingh692004"  # Replace with a secure, random key
-ALGORITHM = "HS256"  # Algorithm used for signing the token
-
-
-def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
-    """
-    Generate a JWT access token.
-
-    Args:
-        data (dict): Data to include in the payload.
-        expires_delta (timedelta, optional): Token expiration duration.
-
-    Returns:
-        str: Encoded JWT token.
-    """
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=1)  # Default: 1 hour
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    admin_id = await create_admin(admin_details)
+    return {"message": "Admin registered successfully", "admin_id": admin_id}
 
 
-@adminRouter.post("/admin-login")
+@adminRouter.post(
+    "/admin-login",
+    dependencies=[Depends(auth_rate_limit), Depends(auth_concurrency_limit)],
+)
 async def admin_login(admin_details: AdminLogin):
     """
     Authenticates an admin based on their ID and password and returns an access token.
@@ -116,93 +73,259 @@ async def admin_login(admin_details: AdminLogin):
         dict: Success message, admin details, and an access token.
 
     Raises:
-        HTTPException: If admin ID is invalid or the password does not match.
+        HTTPException: If admin ID is invalid or the password does not match,
+            or 429 after too many wrong passwords for the admin.
     """
     # Fetch admin by ID
-    admin_present = admin_collection.find_one({"_id": ObjectId(admin_details.admin_id)})
+    admin_present = await admin_collection.find_one(
+        {"_id": ObjectId(admin_details.admin_id)}
+    )
     if not admin_present:
         raise HTTPException(status_code=404, detail="Admin ID not found")
 
     # Verify the password
-    if not verify_password(
+    await check_failed_logins("admin", admin_details.admin_id)
+    if not await verify_password(
         admin_details.admin_password, admin_present["admin_password"]
     ):
+        await record_failed_login("admin", admin_details.admin_id)
         raise HTTPException(status_code=401, detail="Invalid password")
 
-    # Generate access token
-    token_data = {
-        "admin_id": str(admin_present["_id"]),
-        "admin_email": admin_present["admin_email"],
-    }
-    access_token = create_access_token(
-        data=token_data, expires_delta=timedelta(hours=1)
-    )
-
-    # Return successful login details with token
+    # Return successful login details with access and refresh tokens
     return {
         "message": "Login successful",
         "admin_name": admin_present["admin_name"],
         "admin_email": admin_present["admin_email"],
-        "access_token": access_token,
+        **issue_tokens(
+            "admin",
+            str(admin_present["_id"]),
+            admin_email=admin_present["admin_email"],
+        ),
     }
 
 
-@adminRouter.get("/get-all-students")
-async def get_all_students():
+# Fields an admin may request from /get-all-students; the password hash is never exposed
+STUDENT_LIST_FIELDS = {
+    "student_id",
+    "name",
+    "email",
+    "phone",
+    "is_verified",
+    "basic_details",
+    "tenth_details",
+    "twelfth_details",
+    "semester_details",
+}
+DEFAULT_STUDENT_LIST_FIELDS = [
+    "student_id",
+    "name",
+    "email",
+    "phone",
+    "is_verified",
+    "basic_details",
+]
+
+
+def build_student_filter(
+    branch: Optional[str] = None,
+    is_verified: Optional[bool] = None,
+    min_cgpa: Optional[float] = None,
+    max_cgpa: Optional[float] = None,
+) -> dict:
     """
-    Fetch all students with their verification status,
-    and return counts for total, verified, and not verified students.
+    Build the MongoDB filter shared by the student listing endpoints.
+
+    Args:
+        branch (str, optional): Exact branch from basic_details.
+        is_verified (bool, optional): Verification status.
+        min_cgpa (float, optional): Lower bound for the average CGPA.
+        max_cgpa (float, optional): Upper bound for the average CGPA.
 
     Returns:
-        dict: List of all students and counts of verified/not verified students.
+        dict: MongoDB query filter.
     """
-    all_student_cursor = student_collection.find()
-    all_students = []
-    verified_count = 0
-    not_verified_count = 0
-
-    for student in all_student_cursor:
-        student["_id"] = str(student["_id"])
-        all_students.append(student)
-
-        # Assuming there is a 'verified' field in the student document
-        if student.get("is_verified", False):
-            verified_count += 1
-        else:
-            not_verified_count += 1
+    query = {}
+    if branch is not None:
+        query["basic_details.branch"] = branch
+    if is_verified is True:
+        query["is_verified"] = True
+    elif is_verified is False:
+        query["is_verified"] = {"$ne": True}
+    if min_cgpa is not None or max_cgpa is not None:
+        cgpa_range = {}
+        if min_cgpa is not None:
+            cgpa_range["$gte"] = min_cgpa
+        if max_cgpa is not None:
+            cgpa_range["$lte"] = max_cgpa
+        # The same stored average eligibility matching and analytics use
+        query["academic_summary.average_cgpa"] = cgpa_range
+    return query
+
+
+def build_student_projection(fields: Optional[str] = None) -> dict:
+    """
+    Turn a comma separated field list into a projection limited to STUDENT_LIST_FIELDS.
 
-    total_students = len(all_students)
+    Raises:
+        HTTPException: If an unknown field is requested.
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+    else:
+        requested = DEFAULT_STUDENT_LIST_FIELDS
+
+    unknown = set(requested) - STUDENT_LIST_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return {field: 1 for field in requested}
 
+
+async def get_student_counts(query: dict) -> dict:
+    """
+    Count verified and not verified students matching a filter. Without
+    other filters both counts are answered from the is_verified index.
+    """
+    verified, not_verified = await asyncio.gather(
+        student_collection.count_documents({"$and": [query, {"is_verified": True}]}),
+        student_collection.count_documents(
+            {"$and": [query, {"is_verified": {"$ne": True}}]}
+        ),
+    )
     return {
-        "total_students": total_students,
-        "verified_students": verified_count,
-        "not_verified_students": not_verified_count,
-        "all_students": all_students,
+        "total_students": verified + not_verified,
+        "verified_students": verified,
+        "not_verified_students": not_verified,
+    }
+
+
+@adminRouter.get("/get-all-students", dependencies=[Depends(require_admin)])
+async def get_all_students(
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    branch: Optional[str] = None,
+    is_verified: Optional[bool] = None,
+    min_cgpa: Optional[float] = None,
+    max_cgpa: Optional[float] = None,
+):
+    """
+    Fetch one page of students, ordered by insertion, with optional filters.
+    Counts for total, verified, and not verified students matching the filters
+    are returned with the first page only.
+
+    Args:
+        limit (int): Maximum number of students in the page.
+        after (str, optional): The next_cursor value from the previous page.
+        fields (str, optional): Comma separated fields to return.
+        branch (str, optional): Only students from this branch.
+        is_verified (bool, optional): Only verified or only unverified students.
+        min_cgpa (float, optional): Only students with an average CGPA at or above this.
+        max_cgpa (float, optional): Only students with an average CGPA at or below this.
+
+    Returns:
+        dict: The page of students, the cursor for the next page and, on the
+        first page, counts of verified/not verified students.
+    """
+    query = build_student_filter(branch, is_verified, min_cgpa, max_cgpa)
+    projection = build_student_projection(fields)
+
+    page_query = dict(query)
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_query["_id"] = {"$gt": ObjectId(after)}
+
+    # Fetch one extra document to know whether another page exists
+    students = (
+        await student_collection.find(page_query, projection)
+        .sort("_id", 1)
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    has_more = len(students) > limit
+    students = students[:limit]
+
+    response = {
+        "all_students": students,
+        "next_cursor": str(students[-1]["_id"]) if has_more else None,
     }
+    if not after:
+        response.update(await get_student_counts(query))
+    return AppJSONResponse(response)
+
+
+@adminRouter.get("/export-students", dependencies=[Depends(require_admin)])
+async def export_students(
+    file_format: Literal["csv", "ndjson", "xlsx"] = Query("csv", alias="format"),
+    fields: Optional[str] = None,
+    branch: Optional[str] = None,
+    is_verified: Optional[bool] = None,
+    min_cgpa: Optional[float] = None,
+    max_cgpa: Optional[float] = None,
+):
+    """
+    Stream every student matching the filters as a CSV, NDJSON or XLSX file.
+    Rows are read from a cursor and sent in chunks, so memory use does not
+    grow with the number of students.
 
+    Args:
+        file_format (str): "csv", "ndjson" or "xlsx", passed as the `format` query parameter.
+        fields (str, optional): Comma separated fields to export.
+        branch (str, optional): Only students from this branch.
+        is_verified (bool, optional): Only verified or only unverified students.
+        min_cgpa (float, optional): Only students with an average CGPA at or above this.
+        max_cgpa (float, optional): Only students with an average CGPA at or below this.
 
-@adminRouter.get("/get-student-detail/{student_id}")
+    Returns:
+        StreamingResponse: The export as a file attachment.
+    """
+    query = build_student_filter(branch, is_verified, min_cgpa, max_cgpa)
+    projection = build_student_projection(fields)
+    return StreamingResponse(
+        stream_students(query, projection, file_format),
+        media_type=EXPORT_MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="students.{file_format}"'
+        },
+    )
+
+
+@adminRouter.get(
+    "/get-student-detail/{student_id}", dependencies=[Depends(require_admin)]
+)
 async def get_student_detail(student_id: str):
-    student_present = student_collection.find_one({"student_id": student_id})
+    cache_key = profile_key("student_detail", student_id)
+    cached = await profile_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Leave "_id" and "password" fields out of the response
+    student_present = await student_collection.find_one(
+        {"student_id": student_id}, {"_id": 0, "password": 0}
+    )
     if student_present:
-        # Remove "_id" and "password" fields from the response
-        student_present.pop("_id", None)
-        student_present.pop("password", None)
-        return student_present
+        content = serialize_response(student_present)
+        await profile_cache.set(cache_key, content)
+        return Response(content=content, media_type="application/json")
     else:
         return {"message": "Student not found"}
 
 
-@adminRouter.put("/verify-student/{student_id}")
+@adminRouter.put("/verify-student/{student_id}", dependencies=[Depends(require_admin)])
 async def verify_student(student_id: str):
-    # Find the student in the collection
-    student_present = student_collection.find_one({"student_id": student_id})
-    if student_present:
-        if not student_present.get("is_verified", False):
-            # Update the is_verified field to true
-            student_collection.update_one(
-                {"student_id": student_id}, {"$set": {"is_verified": True}}
-            )
+    # Set the flag and get the previous state back in a single operation
+    student_before = await student_collection.find_one_and_update(
+        {"student_id": student_id},
+        {"$set": {"is_verified": True}},
+        projection={"is_verified": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if student_before:
+        if not student_before.get("is_verified", False):
+            student_analytics.mark_stale(student_id)
+            await invalidate_profile(student_id)
             return {"message": f"Student with ID {student_id} has been verified."}
         else:
             return {"message": f"Student with ID {student_id} is already verified."}
@@ -210,7 +333,111 @@ async def verify_student(student_id: str):
         return {"message": "Student not found"}
 
 
-@adminRouter.post("/send-notification")
+@adminRouter.post("/revoke-tokens/{student_id}", dependencies=[Depends(require_admin)])
+async def revoke_student_tokens(student_id: str):
+    """
+    Sign a student out everywhere by revoking every token issued to them.
+    """
+    revoke_tokens(student_id)
+    return {"message": f"Tokens of student {student_id} have been revoked."}
+
+
+@adminRouter.post("/rebuild-academic-summaries", dependencies=[Depends(require_admin)])
+async def rebuild_summaries():
+    """
+    Recompute the academic summaries used for eligibility matching for
+    every student, e.g. after importing data written outside the API.
+    """
+    updated = await rebuild_academic_summaries()
+    return {"message": f"Academic summaries rebuilt for {updated} students."}
+
+
+@adminRouter.post("/import-students", dependencies=[Depends(require_admin)])
+async def import_students(
+    request: Request,
+    file_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+):
+    """
+    Register a batch of students from a CSV or NDJSON request body.
+
+    The body is read as a stream and written in batches of IMPORT_BATCH_SIZE,
+    so memory stays bounded regardless of file size. CSV needs a header line
+    with name, email, contact and password; NDJSON rows may also carry the
+    StudentDetails fields. Invalid or duplicate rows are skipped and reported.
+
+    Args:
+        file_format (str): "csv" or "ndjson", passed as the `format` query parameter.
+
+    Returns:
+        dict: Counts of imported and failed rows and the per-row errors.
+    """
+    try:
+        student_import = StudentImport()
+        result = await student_import.run(request.stream(), file_format)
+        for student_id in student_import.student_ids:
+            student_analytics.mark_stale(student_id)
+        return result
+
+    except HTTPException as http_err:
+        raise http_err
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@adminRouter.get("/placement-analytics", dependencies=[Depends(require_admin)])
+async def placement_analytics(
+    min_cgpa: Optional[float] = 7.0,
+    max_backlogs: Optional[int] = 0,
+    min_tenth: Optional[float] = None,
+    min_twelfth: Optional[float] = None,
+    branch: Optional[str] = None,
+):
+    """
+    Placement statistics computed from the in-memory columnar student data.
+
+    Args:
+        min_cgpa (float, optional): Minimum average CGPA for the threshold count.
+        max_backlogs (int, optional): Maximum total backlogs for the threshold count.
+        min_tenth (float, optional): Minimum 10th percentage for the threshold count.
+        min_twelfth (float, optional): Minimum 12th percentage for the threshold count.
+        branch (str, optional): Restrict the threshold count, percentiles and
+            backlog histogram to one branch.
+
+    Returns:
+        dict: Threshold count, CGPA percentiles, branch-wise CGPA statistics
+        and a backlog histogram.
+    """
+    await student_analytics.refresh()
+    return {
+        "total_students": student_analytics.total,
+        "meeting_criteria": student_analytics.count_meeting(
+            min_cgpa=min_cgpa,
+            max_backlogs=max_backlogs,
+            min_tenth=min_tenth,
+            min_twelfth=min_twelfth,
+            branch=branch,
+        ),
+        "cgpa_percentiles": student_analytics.percentiles(
+            "average_cgpa", [10, 25, 50, 75, 90], branch=branch
+        ),
+        "branch_statistics": student_analytics.branch_statistics(),
+        "backlog_histogram": student_analytics.backlog_histogram(branch=branch),
+    }
+
+
+@adminRouter.get("/cache-stats", dependencies=[Depends(require_admin)])
+async def cache_stats():
+    """
+    Hit ratio and memory use of the profile and token validation caches.
+    """
+    return {
+        "profile_cache": profile_cache.stats(),
+        "token_cache": student_token_cache.stats(),
+    }
+
+
+@adminRouter.post("/send-notification", dependencies=[Depends(require_admin)])
 async def send_notification(
     message: str = Body(..., embed=True),
     student_id: Optional[str] = Body(None, embed=True),
@@ -219,29 +446,30 @@ async def send_notification(
     Send a notification to all students or a specific student.
 
     :param message: The notification message.
-    :param student_id: (Optional) ID of a specific student. If "all", the notification is sent to all students.
+    :param student_id: ID of a specific student. If "all", the notification is sent to all students.
     """
     if not message:
         raise HTTPException(status_code=400, detail="Message is required.")
+    if not student_id:
+        raise HTTPException(
+            status_code=400,
+            detail='student_id is required; use "all" to notify every student.',
+        )
 
     if student_id == "all":
-        # Fetch all student IDs
-        students = student_collection.find({}, {"student_id": 1, "_id": 0})
-        student_ids = [student["student_id"] for student in students]
-
-        if not student_ids:
-            raise HTTPException(status_code=404, detail="No students found.")
-
-        # Insert a notification for each student
-        notifications = [
-            {
-                "message": message,
-                "timestamp": datetime.utcnow(),
-                "student_id": student_id,
-            }
-            for student_id in student_ids
-        ]
-        notifications_collection.insert_many(notifications)
+        # Store a single broadcast document; get_notifications merges it into
+        # every student's feed at read time.
+        notification = {
+            "message": message,
+            "timestamp": datetime.utcnow(),
+            "student_id": "all",
+        }
+        await notifications_collection.insert_one(notification)
+        # The "all" marker counts broadcasts so unread counts stay O(1)
+        await notification_reads_collection.update_one(
+            {"student_id": "all"}, {"$inc": {"broadcast_count": 1}}, upsert=True
+        )
+        notification_hub.publish(notification)
 
         return {"message": "Notification sent to all students."}
 
@@ -252,5 +480,9 @@ async def send_notification(
             "timestamp": datetime.utcnow(),
             "student_id": student_id,
         }
-        notifications_collection.insert_one(notification)
+        await notifications_collection.insert_one(notification)
+        await notification_reads_collection.update_one(
+            {"student_id": student_id}, {"$inc": {"unread_count": 1}}, upsert=True
+        )
+        notification_hub.publish(notification)
         return {"message": f"Notification sent to student with ID {student_id}."}
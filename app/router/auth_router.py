@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from app.models.auth_model import Principal, RefreshTokenRequest
+from app.services.auth import (
+    decode_token,
+    get_current_principal,
+    issue_tokens,
+    revoke_token,
+    revoke_tokens,
+)
+
+authRoute = APIRouter()
+
+
+@authRoute.post("/refresh-token")
+async def refresh_token(request: RefreshTokenRequest):
+    """
+    Exchange a refresh token for a new access and refresh token pair. The
+    presented refresh token is revoked, so it can only be used once.
+
+    Args:
+        request (RefreshTokenRequest): The refresh token issued at login.
+
+    Returns:
+        dict: access_token, refresh_token and token_type.
+
+    Raises:
+        HTTPException: 401 if the refresh token is expired, invalid or revoked.
+    """
+    principal = decode_token(request.refresh_token, token_type="refresh")
+    revoke_token(principal)
+    claims = {
+        key: value
+        for key, value in principal.claims.items()
+        if key not in ("sub", "role", "exp", "iat", "type", "jti")
+    }
+    return issue_tokens(principal.role, principal.subject, **claims)
+
+
+@authRoute.post("/logout")
+async def logout(principal: Principal = Depends(get_current_principal)):
+    """
+    Revoke every access and refresh token issued to the caller so far.
+    """
+    revoke_tokens(principal.subject)
+    return {"message": "Logged out successfully"}
@@ -1,71 +1,238 @@
-from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, UploadFile, Query, Depends, Request
+from fastapi.responses import Response
 from app.config.db import *
 from app.models.company_model import *
 from bson import ObjectId
-import cloudinary
-import cloudinary.uploader
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+from app.services.eligibility import eligible_students_filter
+from app.services.auth import get_current_principal, require_admin
+from app.services.company_snapshot import company_snapshot, etag_matches
+from app.services.storage import (
+    upload_file,
+    create_upload_ticket,
+    verify_uploaded_url,
+)
 
 companyRoute = APIRouter()
 
 
-@companyRoute.post("/add-company")
+@companyRoute.post("/add-company", dependencies=[Depends(require_admin)])
 async def add_company(company_details: CompanyDetails):
     company_data = company_details.dict()
-    result = companies_collection.insert_one(company_data)
+    result = await companies_collection.insert_one(company_data)
+    company_snapshot.invalidate()
     return {
         "message": "Company added successfully",
         "company_id": str(result.inserted_id),
     }
 
 
-@companyRoute.put("/companies/{company_id}/logo", response_model=dict)
+@companyRoute.put(
+    "/companies/{company_id}/logo",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
 async def upload_logo(company_id: str, file: UploadFile):
     """
-    Upload a logo to Cloudinary and update the company's logo URL in MongoDB.
+    Upload a logo to the storage backend and update the company's logo URL in MongoDB.
     """
     try:
-        # Upload logo to Cloudinary
-        upload_result = cloudinary.uploader.upload(file.file, folder="company_logos")
-        logo_url = upload_result.get("secure_url")
+        # Upload logo off the event loop
+        logo_url = await upload_file(file.file, "company_logos", resource_type="image")
         if not logo_url:
             raise HTTPException(
                 status_code=400, detail="Failed to upload logo to Cloudinary"
             )
 
         # Update MongoDB with the Cloudinary URL
-        result = companies_collection.update_one(
+        result = await companies_collection.update_one(
             {"_id": ObjectId(company_id)}, {"$set": {"logo": logo_url}}
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Company not found")
+        company_snapshot.invalidate()
 
         return {"message": "Logo updated successfully", "logo_url": logo_url}
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@companyRoute.get("/companies/", response_model=dict)
-def get_companies():
-    companies = list(companies_collection.find())
-    for company in companies:
-        company["_id"] = str(company["_id"])
-    return {"companies": companies}
+@companyRoute.post(
+    "/companies/{company_id}/logo/upload-url",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
+async def logo_upload_url(company_id: str):
+    """
+    Issue short-lived signed parameters for uploading a logo directly to the
+    storage backend. The client then calls the logo confirm endpoint.
+    """
+    company = await companies_collection.find_one(
+        {"_id": ObjectId(company_id)}, {"_id": 1}
+    )
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return create_upload_ticket(
+        "company_logos", f"company:{company_id}", resource_type="image"
+    )
+
+
+@companyRoute.put(
+    "/companies/{company_id}/logo/confirm",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
+async def confirm_logo(company_id: str, confirmation: ConfirmUpload):
+    """
+    Record the URL of a logo the client uploaded with a signed ticket.
+    """
+    if not verify_uploaded_url(
+        "company_logos",
+        f"company:{company_id}",
+        confirmation.upload_token,
+        confirmation.url,
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload")
+
+    result = await companies_collection.update_one(
+        {"_id": ObjectId(company_id)}, {"$set": {"logo": confirmation.url}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Company not found")
+    company_snapshot.invalidate()
+    return {"message": "Logo updated successfully", "logo_url": confirmation.url}
+
+
+@companyRoute.get(
+    "/companies/", response_model=dict, dependencies=[Depends(get_current_principal)]
+)
+async def get_companies(
+    request: Request,
+    status: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    """
+    List companies from the in-memory snapshot, optionally filtered by status
+    and a recruitmentDate range (YYYY-MM-DD) and paginated. Clients sending
+    the last ETag in If-None-Match get a 304 when nothing has changed.
+    """
+    await company_snapshot.refresh()
+    content, etag = company_snapshot.page(status, from_date, to_date, offset, limit)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@companyRoute.get(
+    "/companies/{company_id}/eligible-students",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
+async def eligible_students(
+    company_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+    include_total: bool = False,
+):
+    """
+    List students who meet a company's eligibility criteria through an
+    indexed query on the students' stored academic summaries, best average
+    CGPA first.
+
+    Pages continue from the (average CGPA, _id) of the previous page's last
+    student on the average_cgpa_id index, so later pages cost the same as
+    the first. Counting every eligible student is a second scan of the
+    range, so the total is only returned on request.
+
+    Args:
+        limit (int): Maximum number of students in the page.
+        after (str, optional): The next_cursor value from the previous page.
+        include_total (bool): Also return the number of eligible students.
+
+    Returns:
+        dict: The page of students, the cursor for the next page and, when
+        requested, total_eligible.
+    """
+    company = await companies_collection.find_one(
+        {"_id": ObjectId(company_id)}, {"eligibility": 1}
+    )
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    query = eligible_students_filter(company["eligibility"])
+    page_query = dict(query)
+    if after:
+        average_cgpa, _, last_id = after.rpartition("_")
+        try:
+            average_cgpa, last_id = float(average_cgpa), ObjectId(last_id)
+        except (ValueError, InvalidId):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_query["$or"] = [
+            {"academic_summary.average_cgpa": {"$lt": average_cgpa}},
+            {"academic_summary.average_cgpa": average_cgpa, "_id": {"$gt": last_id}},
+        ]
+
+    # Fetch one extra student to know whether another page exists
+    students = (
+        await student_collection.find(
+            page_query,
+            {"student_id": 1, "name": 1, "email": 1, "academic_summary": 1},
+        )
+        .sort([("academic_summary.average_cgpa", DESCENDING), ("_id", ASCENDING)])
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    has_more = len(students) > limit
+    students = students[:limit]
+    last = students[-1] if has_more else None
+
+    response = {
+        "students": [
+            {field: value for field, value in student.items() if field != "_id"}
+            for student in students
+        ],
+        "next_cursor": (
+            f"{last['academic_summary']['average_cgpa']!r}_{last['_id']}"
+            if last
+            else None
+        ),
+    }
+    if include_total:
+        response["total_eligible"] = await student_collection.count_documents(query)
+    return response
 
 
-@companyRoute.put("/companies/{company_id}", response_model=dict)
-def update_company(company_id: str, updated_company: CompanyDetails):
-    result = companies_collection.update_one(
+@companyRoute.put(
+    "/companies/{company_id}",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
+async def update_company(company_id: str, updated_company: CompanyDetails):
+    result = await companies_collection.update_one(
         {"_id": ObjectId(company_id)}, {"$set": updated_company.dict()}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Company not found")
+    company_snapshot.invalidate()
     return {"message": "Company updated successfullcompanyRoute"}
 
 
 # Delete a company
-@companyRoute.delete("/companies/{company_id}", response_model=dict)
-def delete_company(company_id: str):
-    result = companies_collection.delete_one({"_id": ObjectId(company_id)})
+@companyRoute.delete(
+    "/companies/{company_id}",
+    response_model=dict,
+    dependencies=[Depends(require_admin)],
+)
+async def delete_company(company_id: str):
+    result = await companies_collection.delete_one({"_id": ObjectId(company_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Company not found")
+    company_snapshot.invalidate()
     return {"message": "Company deleted successfully"}
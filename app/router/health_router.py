@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.config.db import database_health
+from app.services.metrics import render_metrics
+
+healthRoute = APIRouter()
+
+
+@healthRoute.get("/healthz")
+async def healthz():
+    """
+    Readiness probe: pings MongoDB and reports connection pool state.
+    Returns 503 while the database is unreachable so the instance is taken
+    out of rotation without being restarted.
+    """
+    health = await database_health()
+    status_code = 200 if health["status"] == "ok" else 503
+    return JSONResponse(health, status_code=status_code)
+
+
+@healthRoute.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Request, MongoDB, bcrypt and upload timings in the Prometheus text format.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,39 +1,82 @@
-from fastapi import APIRouter, HTTPException, Depends, Security, File, UploadFile
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-import jwt
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    File,
+    UploadFile,
+    Query,
+    Request,
+)
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.config.db import *
 from app.models.pms_model import *
-import re
-from passlib.context import CryptContext
-import random
-from datetime import datetime, timedelta
-import cloudinary
-import cloudinary.uploader
-from bson import ObjectId
+from datetime import datetime
 from app.schemas.pms_schema import *
+from app.services.password_service import hash_password, verify_password
+from app.services.storage import (
+    upload_file,
+    create_upload_ticket,
+    verify_uploaded_url,
+)
+from app.services.eligibility import (
+    ACADEMIC_FIELDS,
+    compute_academic_summary,
+    refresh_academic_summary,
+    eligible_companies_filter,
+)
+from app.services.analytics import student_analytics
+from app.services.student_id_allocator import student_id_allocator
+from app.services.student_import import (
+    build_new_student,
+    create_read_markers,
+    validate_new_student,
+)
+from app.services.serialization import AppJSONResponse, serialize_response
+from app.services.token_cache import student_token_cache
+from app.services.rate_limit import (
+    auth_concurrency_limit,
+    auth_rate_limit,
+    check_failed_logins,
+    record_failed_login,
+)
+from app.services.profile_cache import (
+    profile_cache,
+    profile_key,
+    invalidate_profile,
+)
+from app.services.auth import (
+    issue_tokens,
+    decode_token,
+    get_current_principal,
+    require_admin,
+    authorize_student,
+    check_student_access,
+)
+from app.models.auth_model import Principal
+from app.services.notification_hub import notification_hub, format_event
 
 pms_route = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-# Secret key for JWT
-SECRET_KEY = "rohitsingh"  # Change this to a random secret key
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Student IDs tried before signin gives up on finding a free one
+STUDENT_ID_MAX_ATTEMPTS = 5
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+# Idle push connections get a comment line this often to keep proxies open
+NOTIFICATION_KEEPALIVE_SECONDS = 15
 
 
-@pms_route.post("/student-signin")
+@pms_route.post(
+    "/student-signin",
+    dependencies=[Depends(auth_rate_limit), Depends(auth_concurrency_limit)],
+)
 async def student_signin(student_signin: AddStudent):
     """
     Registers a new student by validating their email, contact number,
-    and hashing their password. Generates a unique 12-digit student ID
+    and hashing their password. Allocates a unique 12-digit student ID
     starting with 'SSGI20' and saves the student's details in the database.
 
     Args:
@@ -46,55 +89,49 @@ async def student_signin(student_signin: AddStudent):
     - JSON response with a success message and the generated student ID.
     """
     try:
-        # Check if the student with the same email already exists
-        student_present = student_collection.find_one({"email": student_signin.email})
-        if student_present:
-            raise HTTPException(
-                status_code=400, detail="Student with that email already exists"
-            )
-
-        # Validate email format
-        if not re.search(r"(\w{1,})@([a-z]+).([a-z]+)", student_signin.email):
-            raise HTTPException(status_code=400, detail="Invalid Email Address")
-
-        # Validate contact number length (e.g., must be 10 digits)
-        if len(student_signin.contact) != 10 or not student_signin.contact.isdigit():
-            raise HTTPException(
-                status_code=400, detail="Invalid Contact Number. Must be 10 digits."
-            )
+        validate_new_student(student_signin)
 
         # Hash the password before saving it
-        hashed_password = pwd_context.hash(student_signin.password)
-
-        # Generate a 12-digit student ID starting with 'SSGI20'
-        student_id = "SSGI20" + str(
-            random.randint(100000, 999999)
-        )  # Remaining 6 digits
+        hashed_password = await hash_password(student_signin.password)
 
         # Create new student entry
-        new_student = {
-            "student_id": student_id,
-            "name": student_signin.name,
-            "email": student_signin.email,
-            "password": hashed_password,  # Store the hashed password
-            "phone": student_signin.contact,
-            "is_verified": False,
-        }
-
-        # Insert the student into the database
-        student_collection.insert_one(new_student)
+        new_student = build_new_student(student_signin, hashed_password)
+
+        # Insert the student with the next allocated ID. The unique indexes
+        # reject duplicate emails, and IDs already taken by students
+        # registered before the allocator existed are skipped.
+        for _ in range(STUDENT_ID_MAX_ATTEMPTS):
+            student_id = await student_id_allocator.allocate()
+            new_student["student_id"] = student_id
+            new_student.pop("_id", None)
+            try:
+                await student_collection.insert_one(new_student)
+                break
+            except DuplicateKeyError as e:
+                if "email" in (e.details or {}).get("keyPattern", {}):
+                    raise HTTPException(
+                        status_code=400, detail="Student with that email already exists"
+                    )
+        else:
+            raise HTTPException(
+                status_code=500, detail="Could not allocate a unique student ID"
+            )
+        await create_read_markers([student_id])
+        student_analytics.mark_stale(student_id)
 
         return {"message": "Student registered successfully", "student_id": student_id}
 
+    except HTTPException as http_err:
+        raise http_err
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-@pms_route.post("/student-login")
+@pms_route.post(
+    "/student-login",
+    dependencies=[Depends(auth_rate_limit), Depends(auth_concurrency_limit)],
+)
 async def student_login(student_detail: StudentLogin):
     """
     Endpoint to authenticate a student using their student ID and password.
@@ -103,17 +140,19 @@ async def student_login(student_detail: StudentLogin):
         student_detail (StudentLogin): A Pydantic model containing the student_id and password.
 
     Returns:
-        dict: A success message with the student's ID if login is successful.
+        dict: A success message with the student's ID and an access and
+        refresh token if login is successful.
 
     Raises:
         HTTPException:
             404: Raised if the student ID is not found in the database.
             401: Raised if the provided password does not match the stored hashed password.
+            429: Raised after too many wrong passwords for the student ID.
             500: Raised if any internal server error occurs during the process.
     """
     try:
         # Check if student exists in the database
-        student_present = student_collection.find_one(
+        student_present = await student_collection.find_one(
             {"student_id": student_detail.student_id}
         )
 
@@ -121,19 +160,24 @@ async def student_login(student_detail: StudentLogin):
             raise HTTPException(status_code=404, detail="Student not found")
 
         # Check if the password matches
-        if not verify_password(student_detail.password, student_present["password"]):
-            raise HTTPException(status_code=401, detail="Incorrect password")
-
-        if student_present and verify_password(
+        await check_failed_logins("student", student_detail.student_id)
+        if not await verify_password(
             student_detail.password, student_present["password"]
         ):
-            student_name = student_present.get("name", "Student")
+            await record_failed_login("student", student_detail.student_id)
+            raise HTTPException(status_code=401, detail="Incorrect password")
+
+        student_name = student_present.get("name", "Student")
 
         return {
             "message": "Login successful",
             "student_id": student_detail.student_id,
             "student_name": student_name,
-            # Send the token back to the client
+            **issue_tokens(
+                "student",
+                student_detail.student_id,
+                student_id=student_detail.student_id,
+            ),
         }
 
     except HTTPException as http_err:
@@ -161,31 +205,44 @@ async def verify_token(token: str):
             500: Raised for any other internal server error.
     """
     try:
-        # Decode the token to get the student ID and verify it hasn't expired
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        student_id = payload.get("student_id")
-
-        if not student_id:
+        # Checks the signature, expiry, token type and revocation list; a
+        # refresh token is rejected here
+        principal = decode_token(token)
+        if principal.role != "student":
             raise HTTPException(status_code=401, detail="Invalid token")
+        student_id = principal.subject
 
-        # Optionally, you can also check if the student exists in the database
-        student_present = student_collection.find_one({"student_id": student_id})
-        if not student_present:
-            raise HTTPException(status_code=404, detail="Student not found")
+        # Only check that the student exists if it was not validated recently
+        if not student_token_cache.get(student_id):
+            student_present = await student_collection.find_one(
+                {"student_id": student_id}, {"_id": 1}
+            )
+            if not student_present:
+                raise HTTPException(status_code=404, detail="Student not found")
+            student_token_cache.put(student_id, principal.claims.get("exp", 0))
 
         return {"message": "Token is valid", "student_id": student_id}
 
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException as http_err:
+        raise http_err
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@pms_route.post("/student-detail", tags=["Student Collection"])
+@pms_route.get("/student/token-cache-stats", dependencies=[Depends(require_admin)])
+async def token_cache_stats():
+    """
+    Hit/miss counters of the token validation cache used by verify-token.
+    """
+    return student_token_cache.stats()
+
+
+@pms_route.post(
+    "/student-detail",
+    tags=["Student Collection"],
+    dependencies=[Depends(authorize_student)],
+)
 async def create_student_detail(student_id: str, student_detail: StudentDetails):
     """
     API to create and save a student's basic details in MongoDB for a specific student_id.
@@ -198,11 +255,6 @@ async def create_student_detail(student_id: str, student_detail: StudentDetails)
     - JSON response with a success message if update is successful.
     """
     try:
-        # Check if the student with the provided student_id exists
-        student_present = student_collection.find_one({"student_id": student_id})
-        if not student_present:
-            raise HTTPException(status_code=404, detail="Student not found")
-
         # Prepare the data without marksheets
         student_data = {
             "basic_details": student_detail.basic_details.model_dump(
@@ -218,16 +270,18 @@ async def create_student_detail(student_id: str, student_detail: StudentDetails)
                 semester.model_dump() for semester in student_detail.semester_details
             ],
         }
+        # Keep the derived aggregates used by eligibility queries in the same write
+        student_data["academic_summary"] = compute_academic_summary(student_data)
 
         # Update the student record with the new details
-        update_result = student_collection.update_one(
+        update_result = await student_collection.update_one(
             {"student_id": student_id}, {"$set": student_data}
         )
 
-        if update_result.modified_count == 0:
-            raise HTTPException(
-                status_code=500, detail="Failed to update student details"
-            )
+        if update_result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Student not found")
+        student_analytics.mark_stale(student_id)
+        await invalidate_profile(student_id)
 
         return {
             "message": "Student details updated successfully",
@@ -241,7 +295,11 @@ async def create_student_detail(student_id: str, student_detail: StudentDetails)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@pms_route.put("/upload-marksheets", tags=["Student Collection"])
+@pms_route.put(
+    "/upload-marksheets",
+    tags=["Student Collection"],
+    dependencies=[Depends(authorize_student)],
+)
 async def upload_marksheets(
     student_id: str,
     tenth_marksheet: UploadFile = File(...),
@@ -249,96 +307,470 @@ async def upload_marksheets(
     semester_marksheets: List[UploadFile] = File(...),
 ):
     try:
-        # Fetch student document to ensure student exists
-        student_doc = student_collection.find_one({"student_id": student_id})
-        if not student_doc:
+        # Uploads cost far more than a round-trip, so never start them for
+        # a student that does not exist
+        student_present = await student_collection.find_one(
+            {"student_id": student_id}, {"_id": 1}
+        )
+        if not student_present:
             raise HTTPException(
                 status_code=404, detail="Student not found in the database"
             )
 
-        # Function to upload files to Cloudinary
-        def upload_file(file, folder_name):
-            return cloudinary.uploader.upload(
-                file.file, resource_type="auto", folder=folder_name
-            )["secure_url"]
-
-        # Upload files to Cloudinary
-        tenth_url = upload_file(tenth_marksheet, "MinorProject/10th")
-        twelfth_url = upload_file(twelfth_marksheet, "MinorProject/12th")
-        semester_urls = [
-            upload_file(sem, "MinorProject/Semesters") for sem in semester_marksheets
+        # Upload every marksheet concurrently; the storage service bounds
+        # concurrency and applies a per-file timeout
+        uploads = [
+            ("tenth_details.marksheet_url", tenth_marksheet, "MinorProject/10th"),
+            ("twelfth_details.marksheet_url", twelfth_marksheet, "MinorProject/12th"),
+            *(
+                (f"semester_details.{i}.marksheet_url", sem, "MinorProject/Semesters")
+                for i, sem in enumerate(semester_marksheets)
+            ),
         ]
+        results = await asyncio.gather(
+            *(upload_file(file.file, folder) for _, file, folder in uploads),
+            return_exceptions=True,
+        )
 
-        # Aggregate update operation for MongoDB
-        update_fields = {
-            "tenth_details.marksheet_url": tenth_url,  # Removed .0 index
-            "twelfth_details.marksheet_url": twelfth_url,  # Removed .0 index
-            **{
-                f"semester_details.{i}.marksheet_url": url
-                for i, url in enumerate(semester_urls)
-            },
-        }
+        update_fields = {}
+        failed_uploads = []
+        for (field, file, _), result in zip(uploads, results):
+            if isinstance(result, BaseException):
+                failed_uploads.append(
+                    {
+                        "field": field,
+                        "filename": file.filename,
+                        "error": str(result) or type(result).__name__,
+                    }
+                )
+            else:
+                update_fields[field] = result
+
+        if not update_fields:
+            raise HTTPException(
+                status_code=502,
+                detail={"message": "All uploads failed", "failed": failed_uploads},
+            )
 
-        # Execute update in a single operation
-        update_result = student_collection.update_one(
+        # Save every uploaded URL in a single operation once all uploads finish
+        update_result = await student_collection.update_one(
             {"student_id": student_id}, {"$set": update_fields}
         )
 
-        if update_result.modified_count == 0:
+        if update_result.matched_count == 0:
             raise HTTPException(
-                status_code=500, detail="Failed to update marksheets URLs."
+                status_code=404, detail="Student not found in the database"
             )
+        await invalidate_profile(student_id)
 
         return {
-            "message": "Marksheets uploaded and URLs saved successfully",
+            "message": (
+                "Some marksheets failed to upload"
+                if failed_uploads
+                else "Marksheets uploaded and URLs saved successfully"
+            ),
             "marksheet_urls": {
-                "tenth_marksheet_url": tenth_url,
-                "twelfth_marksheet_url": twelfth_url,
-                "semester_marksheets_urls": semester_urls,
+                "tenth_marksheet_url": update_fields.get("tenth_details.marksheet_url"),
+                "twelfth_marksheet_url": update_fields.get(
+                    "twelfth_details.marksheet_url"
+                ),
+                "semester_marksheets_urls": [
+                    update_fields.get(f"semester_details.{i}.marksheet_url")
+                    for i in range(len(semester_marksheets))
+                ],
             },
+            "failed_uploads": failed_uploads,
         }
 
+    except HTTPException as http_err:
+        raise http_err
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@pms_route.get("/view-profile", tags=["Student Collection"])
+# Storage folder and student document field for each kind of marksheet
+MARKSHEET_TARGETS = {
+    "tenth": ("MinorProject/10th", "tenth_details.marksheet_url"),
+    "twelfth": ("MinorProject/12th", "twelfth_details.marksheet_url"),
+    "semester": ("MinorProject/Semesters", "semester_details.$[sem].marksheet_url"),
+}
+
+
+@pms_route.post(
+    "/marksheet-upload-url",
+    tags=["Student Collection"],
+    dependencies=[Depends(authorize_student)],
+)
+async def marksheet_upload_url(student_id: str, marksheet: str):
+    """
+    Issue short-lived signed parameters for uploading one marksheet directly
+    to the storage backend. The client then calls /confirm-marksheet.
+
+    Args:
+    - student_id (str): Unique identifier of the student.
+    - marksheet (str): "tenth", "twelfth" or "semester".
+
+    Returns:
+    - JSON response with the upload URL, signed form fields and upload_token.
+    """
+    if marksheet not in MARKSHEET_TARGETS:
+        raise HTTPException(status_code=400, detail="Invalid marksheet type")
+
+    student_present = await student_collection.find_one(
+        {"student_id": student_id}, {"_id": 1}
+    )
+    if not student_present:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    folder, _ = MARKSHEET_TARGETS[marksheet]
+    return create_upload_ticket(folder, f"student:{student_id}")
+
+
+@pms_route.put("/confirm-marksheet", tags=["Student Collection"])
+async def confirm_marksheet(
+    confirmation: ConfirmMarksheet,
+    principal: Principal = Depends(get_current_principal),
+):
+    """
+    Record the URL of a marksheet the client uploaded with a signed ticket.
+
+    Args:
+    - confirmation (ConfirmMarksheet): Student, marksheet type (and semester
+      number for semester marksheets), the upload_token and the resulting URL.
+
+    Returns:
+    - JSON response with the saved URL.
+    """
+    check_student_access(principal, confirmation.student_id)
+    if confirmation.marksheet not in MARKSHEET_TARGETS:
+        raise HTTPException(status_code=400, detail="Invalid marksheet type")
+    if confirmation.marksheet == "semester" and confirmation.semester is None:
+        raise HTTPException(status_code=400, detail="Semester is required")
+
+    folder, field = MARKSHEET_TARGETS[confirmation.marksheet]
+    if not verify_uploaded_url(
+        folder,
+        f"student:{confirmation.student_id}",
+        confirmation.upload_token,
+        confirmation.url,
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload")
+
+    query = {"student_id": confirmation.student_id}
+    update_options = {}
+    not_found = "Student not found"
+    if confirmation.marksheet == "semester":
+        # Without the semester in the filter a missing semester would match
+        # the student, update nothing and still report success
+        query["semester_details.semester"] = confirmation.semester
+        update_options["array_filters"] = [{"sem.semester": confirmation.semester}]
+        not_found = "Student or semester not found"
+
+    update_result = await student_collection.update_one(
+        query, {"$set": {field: confirmation.url}}, **update_options
+    )
+    if update_result.matched_count == 0:
+        raise HTTPException(status_code=404, detail=not_found)
+    await invalidate_profile(confirmation.student_id)
+
+    return {"message": "Marksheet URL saved successfully", "url": confirmation.url}
+
+
+@pms_route.get(
+    "/eligible-companies/{student_id}",
+    tags=["Student Collection"],
+    dependencies=[Depends(authorize_student)],
+)
+async def eligible_companies(student_id: str):
+    """
+    List the companies whose eligibility criteria the student meets, using
+    the student's stored academic summary and the companies' eligibility index.
+
+    Args:
+    - student_id (str): Unique identifier of the student.
+
+    Returns:
+    - JSON response with the eligible companies.
+    """
+    student = await student_collection.find_one(
+        {"student_id": student_id}, {"academic_summary": 1}
+    )
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    summary = student.get("academic_summary")
+    if not summary or summary.get("average_cgpa") is None:
+        return {"companies": []}
+
+    companies = await companies_collection.find(
+        eligible_companies_filter(summary)
+    ).to_list(None)
+    return AppJSONResponse({"companies": companies})
+
+
+@pms_route.get(
+    "/view-profile",
+    tags=["Student Collection"],
+    dependencies=[Depends(authorize_student)],
+)
 async def view_profile(student_id: str):
-    student_present = student_collection.find_one({"student_id": student_id})
+    cache_key = profile_key("view_profile", student_id)
+    cached = await profile_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    student_present = await student_collection.find_one({"student_id": student_id})
     if not student_present:
         raise HTTPException(status_code=404, detail="Student not found")
-    return {"Student Detail": list_serial_student([student_present])}
+
+    content = serialize_response(
+        {"Student Detail": list_serial_student([student_present])}
+    )
+    await profile_cache.set(cache_key, content)
+    return Response(content=content, media_type="application/json")
+
+
+async def get_notification_markers(student_id: str) -> tuple:
+    """
+    Fetch the student's read marker and the broadcast counter in one indexed read.
+
+    Returns:
+        tuple: (student marker, broadcast marker), each {} when missing.
+    """
+    markers = notification_reads_collection.find(
+        {"student_id": {"$in": [student_id, "all"]}}
+    )
+    student_marker, broadcast_marker = {}, {}
+    async for marker in markers:
+        if marker["student_id"] == "all":
+            broadcast_marker = marker
+        else:
+            student_marker = marker
+    return student_marker, broadcast_marker
 
 
-@pms_route.get("/get-notifications/{student_id}")
-async def get_notifications(student_id: str):
+def notification_cursor(notification: dict) -> str:
     """
-    Get notifications for a specific student.
+    Encode a notification's (timestamp, _id) sort key as a page cursor.
+    """
+    return f"{notification['timestamp'].isoformat()}_{notification['_id']}"
+
+
+def parse_notification_cursor(cursor: str) -> tuple:
+    """
+    Returns:
+        tuple: (timestamp, ObjectId) decoded from notification_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    timestamp, _, notification_id = cursor.rpartition("_")
+    try:
+        return datetime.fromisoformat(timestamp), ObjectId(notification_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@pms_route.get(
+    "/get-notifications/{student_id}", dependencies=[Depends(authorize_student)]
+)
+async def get_notifications(
+    student_id: str,
+    since: Optional[datetime] = None,
+    before: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Get a page of notifications for a specific student, newest first.
+
+    Broadcasts are stored once with student_id "all" and merged with the
+    student's own notifications here, using the (student_id, timestamp, _id)
+    index. Notifications sent in the same millisecond share a timestamp, so
+    pages are ordered and split on the _id as well. The unread count is
+    derived from counters rather than a scan.
 
     :param student_id: The ID of the student fetching their notifications.
-    :return: A list of notifications.
+    :param since: Only notifications newer than this timestamp (for polling).
+    :param before: The next_before value from the previous page.
+    :param limit: Maximum number of notifications to return.
+    :return: A page of notifications, the cursor for the next page and the unread count.
     """
-    # Fetch notifications specific to the student or sent to "all"
-    notifications = notifications_collection.find(
-        {"$or": [{"student_id": student_id}, {"student_id": "all"}]}
+    query = {"student_id": {"$in": [student_id, "all"]}}
+    if since:
+        query["timestamp"] = {"$gt": since}
+    if before:
+        timestamp, notification_id = parse_notification_cursor(before)
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": notification_id}},
+        ]
+
+    # Fetch one extra notification to know whether another page exists
+    notifications = (
+        await notifications_collection.find(query)
+        .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+        .to_list(None)
     )
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    student_marker, broadcast_marker = await get_notification_markers(student_id)
+    last_read_at = student_marker.get("last_read_at")
 
     notifications_list = [
-        {"message": notification["message"], "timestamp": notification["timestamp"]}
+        {
+            "notification_id": str(notification["_id"]),
+            "message": notification["message"],
+            "timestamp": notification["timestamp"],
+            "read": last_read_at is not None
+            and notification["timestamp"] <= last_read_at,
+        }
         for notification in notifications
     ]
 
-    if not notifications_list:
-        return {"message": "No notifications found."}
+    unread_count = student_marker.get("unread_count", 0) + max(
+        broadcast_marker.get("broadcast_count", 0)
+        - student_marker.get("broadcasts_read", 0),
+        0,
+    )
+
+    return {
+        "notifications": notifications_list,
+        "unread_count": unread_count,
+        "next_before": (notification_cursor(notifications[-1]) if has_more else None),
+    }
+
 
-    return {"notifications": notifications_list}
+@pms_route.get("/notifications/stream/{student_id}")
+async def stream_notifications(
+    student_id: str, request: Request, access_token: str = Query(...)
+):
+    """
+    Push new notifications to a student as server-sent events, replacing
+    polling of /get-notifications. A "resync" event means the connection
+    fell behind and the client should refetch its feed.
+
+    :param student_id: The ID of the student subscribing to notifications.
+    :param access_token: Access token; EventSource cannot send an Authorization header.
+    """
+    check_student_access(decode_token(access_token), student_id)
+    queue = notification_hub.subscribe(student_id)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    notification = await asyncio.wait_for(
+                        queue.get(), timeout=NOTIFICATION_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(notification)
+        finally:
+            notification_hub.unsubscribe(student_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@pms_route.put(
+    "/mark-notifications-read/{student_id}", dependencies=[Depends(authorize_student)]
+)
+async def mark_notifications_read(student_id: str):
+    """
+    Mark every notification up to now, including broadcasts, as read by
+    moving the student's read marker forward and resetting the counters.
+
+    :param student_id: The ID of the student reading their notifications.
+    """
+    broadcast_marker = await notification_reads_collection.find_one(
+        {"student_id": "all"}
+    )
+    broadcasts_read = (broadcast_marker or {}).get("broadcast_count", 0)
+
+    await notification_reads_collection.update_one(
+        {"student_id": student_id},
+        {
+            "$set": {
+                "last_read_at": datetime.utcnow(),
+                "unread_count": 0,
+                "broadcasts_read": broadcasts_read,
+            }
+        },
+        upsert=True,
+    )
+    return {"message": "Notifications marked as read."}
+
+
+def flatten_profile_update(profile_updates: UpdateProfile) -> tuple:
+    """
+    Flatten an UpdateProfile into dotted $set paths.
+
+    Semester entries are addressed with an arrayFilters identifier per
+    semester number, e.g. semester_details.$[sem3].cgpa with
+    {"sem3.semester": 3}.
+
+    Returns:
+        tuple: ($set fields, arrayFilters, {semester number: fields sent}).
+
+    Raises:
+        HTTPException: If a semester entry has no semester number.
+    """
+    set_fields = {}
+    for section in ("basic_details", "tenth_details", "twelfth_details"):
+        details = getattr(profile_updates, section)
+        if details:
+            for field, value in details.model_dump(exclude_unset=True).items():
+                set_fields[f"{section}.{field}"] = value
+
+    semester_updates = {}
+    for semester in profile_updates.semester_details or []:
+        fields = semester.model_dump(exclude_unset=True)
+        number = fields.get("semester")
+        if number is None:
+            raise HTTPException(
+                status_code=400, detail="Each semester update needs its semester number"
+            )
+        # A semester sent twice is merged, the later entry winning per field
+        semester_updates[number] = {**semester_updates.get(number, {}), **fields}
+
+    array_filters = []
+    for number, fields in semester_updates.items():
+        changes = {
+            field: value for field, value in fields.items() if field != "semester"
+        }
+        if changes:
+            # MongoDB rejects array filters that no update path uses
+            identifier = f"sem{number}"
+            array_filters.append({f"{identifier}.semester": number})
+            for field, value in changes.items():
+                set_fields[f"semester_details.$[{identifier}].{field}"] = value
+
+    return set_fields, array_filters, semester_updates
 
 
-@pms_route.put("/update-profile", tags=["Student Profile"])
+@pms_route.put(
+    "/update-profile",
+    tags=["Student Profile"],
+    dependencies=[Depends(authorize_student)],
+)
 async def update_profile(student_id: str, profile_updates: UpdateProfile):
     """
     Update a student's profile details in MongoDB.
 
+    Only the fields present in the request are written: nested details
+    become dotted $set paths and semesters are matched by their semester
+    number, so unchanged fields and other semesters are left untouched.
+    Semesters the student does not have yet are appended, and a student
+    with no semesters at all gets the ones sent as their semester list.
+
     Args:
     - student_id (str): Unique identifier of the student.
     - profile_updates (UpdateProfile): The updated profile details.
@@ -347,40 +779,84 @@ async def update_profile(student_id: str, profile_updates: UpdateProfile):
     - JSON response indicating success or failure.
     """
     try:
-        # Check if student exists
-        student_present = student_collection.find_one({"student_id": student_id})
-        if not student_present:
-            raise HTTPException(status_code=404, detail="Student not found")
-
-        # Prepare update data
-        update_data = {}
-        if profile_updates.basic_details:
-            update_data["basic_details"] = profile_updates.basic_details.dict(
-                exclude_unset=True
+        set_fields, array_filters, semester_updates = flatten_profile_update(
+            profile_updates
+        )
+        if not set_fields and not semester_updates:
+            raise HTTPException(
+                status_code=400, detail="No changes were made to the student profile"
             )
-        if profile_updates.tenth_details:
-            update_data["tenth_details"] = profile_updates.tenth_details.dict(
-                exclude_unset=True
+
+        # Apply the update and read back the academic fields in one round-trip
+        if set_fields:
+            query = {"student_id": student_id}
+            update_options = {}
+            if array_filters:
+                # arrayFilters fail on a document without the array, so
+                # those documents are left to the update below
+                query["semester_details"] = {"$type": "array"}
+                update_options["array_filters"] = array_filters
+            student = await student_collection.find_one_and_update(
+                query,
+                {"$set": set_fields},
+                projection=ACADEMIC_FIELDS,
+                return_document=ReturnDocument.AFTER,
+                **update_options,
             )
-        if profile_updates.twelfth_details:
-            update_data["twelfth_details"] = profile_updates.twelfth_details.dict(
-                exclude_unset=True
+            if student is None and array_filters:
+                # No semester_details yet: the semesters sent become the array
+                other_fields = {
+                    field: value
+                    for field, value in set_fields.items()
+                    if not field.startswith("semester_details.")
+                }
+                student = await student_collection.find_one_and_update(
+                    {
+                        "student_id": student_id,
+                        "semester_details": {"$not": {"$type": "array"}},
+                    },
+                    {
+                        "$set": {
+                            **other_fields,
+                            "semester_details": list(semester_updates.values()),
+                        }
+                    },
+                    projection=ACADEMIC_FIELDS,
+                    return_document=ReturnDocument.AFTER,
+                )
+        else:
+            student = await student_collection.find_one(
+                {"student_id": student_id}, ACADEMIC_FIELDS
             )
-        if profile_updates.semester_details:
-            update_data["semester_details"] = [
-                sem.dict(exclude_unset=True) for sem in profile_updates.semester_details
-            ]
-
-        # Perform the update
-        update_result = student_collection.update_one(
-            {"student_id": student_id}, {"$set": update_data}
-        )
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
 
-        if update_result.modified_count == 0:
-            raise HTTPException(
-                status_code=400, detail="No changes were made to the student profile"
+        # arrayFilters cannot create elements, so push semesters not stored yet
+        existing = {
+            semester.get("semester")
+            for semester in student.get("semester_details") or []
+        }
+        new_semesters = [
+            semester
+            for number, semester in semester_updates.items()
+            if number not in existing
+        ]
+        if new_semesters:
+            student = await student_collection.find_one_and_update(
+                {"student_id": student_id},
+                {"$push": {"semester_details": {"$each": new_semesters}}},
+                projection=ACADEMIC_FIELDS,
+                return_document=ReturnDocument.AFTER,
             )
 
+        academic_changed = new_semesters or any(
+            not field.startswith("basic_details.") for field in set_fields
+        )
+        if academic_changed:
+            await refresh_academic_summary(student_id, student)
+        student_analytics.mark_stale(student_id)
+        await invalidate_profile(student_id)
+
         return {
             "message": "Student profile updated successfully",
             "student_id": student_id,
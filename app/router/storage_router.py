@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, File, Form, UploadFile
+from app.services.storage import LocalStorage, storage, verify_signature
+
+storageRoute = APIRouter()
+
+
+@storageRoute.post("/uploads/local")
+def local_upload(
+    folder: str = Form(...),
+    public_id: str = Form(...),
+    expires: int = Form(...),
+    signature: str = Form(...),
+    file: UploadFile = File(...),
+):
+    """
+    Receive a direct upload for the local storage stand-in, checking the
+    signature the same way the real storage backend would.
+    """
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Local storage is not enabled")
+    if not verify_signature(folder, public_id, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+    url = storage.upload(file.file, folder, public_id=public_id)
+    return {"secure_url": url}
@@ -0,0 +1,84 @@
+import logging
+import os
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app.config.db import *
+from app.models.admin_model import AdminDetails
+from app.services.password_service import hash_password
+
+logger = logging.getLogger("app.admins")
+
+# The first admin, created at startup while no admin exists. Every later
+# admin is registered by an existing one through /admin-register.
+BOOTSTRAP_ADMIN_NAME = os.getenv("BOOTSTRAP_ADMIN_NAME", "Administrator")
+BOOTSTRAP_ADMIN_EMAIL = os.getenv("BOOTSTRAP_ADMIN_EMAIL")
+BOOTSTRAP_ADMIN_CONTACT = os.getenv("BOOTSTRAP_ADMIN_CONTACT")
+BOOTSTRAP_ADMIN_PASSWORD = os.getenv("BOOTSTRAP_ADMIN_PASSWORD")
+
+
+async def create_admin(admin_details: AdminDetails) -> str:
+    """
+    Validate, hash the password of and store a new admin.
+
+    Returns:
+        str: The new admin ID.
+
+    Raises:
+        HTTPException: If the phone number is invalid, the password is too
+        short or the email already exists.
+    """
+    # Validate contact number and password length
+    if len(str(admin_details.admin_contact)) != 10:
+        raise HTTPException(status_code=400, detail="Phone number must be 10 digits")
+    if len(admin_details.admin_password) < 7:
+        raise HTTPException(
+            status_code=400, detail="Password must be at least 7 characters long"
+        )
+
+    # Hash the password before storing
+    hashed_password = await hash_password(admin_details.admin_password)
+    admin_details_dict = dict(admin_details)
+    admin_details_dict["admin_password"] = hashed_password
+
+    # Insert into the database; the unique admin_email index rejects duplicates
+    try:
+        result = await admin_collection.insert_one(admin_details_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Email already exists")
+    return str(result.inserted_id)
+
+
+async def bootstrap_admin():
+    """
+    Create the first admin from the BOOTSTRAP_ADMIN_EMAIL, _CONTACT,
+    _PASSWORD (and optional _NAME) settings when they are set and no admin
+    exists yet. Its admin_id is logged for the first login.
+
+    Raises:
+        RuntimeError: If the settings do not describe a valid admin.
+    """
+    if not BOOTSTRAP_ADMIN_EMAIL:
+        return
+    if await admin_collection.find_one({}, {"_id": 1}):
+        return
+    try:
+        admin_id = await create_admin(
+            AdminDetails(
+                admin_name=BOOTSTRAP_ADMIN_NAME,
+                admin_email=BOOTSTRAP_ADMIN_EMAIL,
+                admin_contact=int(BOOTSTRAP_ADMIN_CONTACT or 0),
+                admin_password=BOOTSTRAP_ADMIN_PASSWORD or "",
+            )
+        )
+    except HTTPException as e:
+        if e.status_code == 409:
+            # Another worker created it first
+            return
+        raise RuntimeError(f"Invalid BOOTSTRAP_ADMIN settings: {e.detail}")
+    logger.warning(
+        "Created the bootstrap admin %s with admin_id %s",
+        BOOTSTRAP_ADMIN_EMAIL,
+        admin_id,
+    )
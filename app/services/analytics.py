@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from app.config.db import *
+from app.services.eligibility import ACADEMIC_FIELDS, compute_academic_summary
+
+# Full reloads pick up writes made through other workers
+ANALYTICS_MAX_AGE_SECONDS = int(os.getenv("ANALYTICS_MAX_AGE_SECONDS", 300))
+
+NUMERIC_COLUMNS = (
+    "latest_cgpa",
+    "average_cgpa",
+    "total_backlogs",
+    "tenth_percentage",
+    "twelfth_percentage",
+)
+ANALYTICS_PROJECTION = {
+    "student_id": 1,
+    "is_verified": 1,
+    "basic_details.branch": 1,
+    **ACADEMIC_FIELDS,
+}
+
+
+class StudentAnalytics:
+    """
+    Columnar, in-memory copy of the numeric student fields so placement
+    statistics are answered with vectorized NumPy operations instead of
+    pulling every student document per request.
+
+    Each column is a float array (NaN where data is missing) with one row per
+    student. Writes only mark a student as stale; stale rows are re-read in
+    one batched query before the next statistic is computed.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._row = {}
+        self._size = 0
+        self._columns = {name: np.empty(0) for name in NUMERIC_COLUMNS}
+        self._branch_codes = np.empty(0, dtype=np.int32)
+        self._verified = np.empty(0, dtype=bool)
+        self._branches = []
+        self._branch_code = {}
+        self._stale = set()
+        self._loaded_at = None
+
+    def mark_stale(self, student_id: str):
+        """
+        Record that a student's data changed; called by write endpoints.
+        """
+        self._stale.add(student_id)
+
+    def _encode_branch(self, branch) -> int:
+        branch = branch or "Unknown"
+        if branch not in self._branch_code:
+            self._branch_code[branch] = len(self._branches)
+            self._branches.append(branch)
+        return self._branch_code[branch]
+
+    def _grow(self, capacity: int):
+        for name, column in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+        branch_codes = np.zeros(capacity, dtype=np.int32)
+        branch_codes[: self._size] = self._branch_codes[: self._size]
+        self._branch_codes = branch_codes
+        verified = np.zeros(capacity, dtype=bool)
+        verified[: self._size] = self._verified[: self._size]
+        self._verified = verified
+
+    def _store(self, student: dict):
+        row = self._row.get(student["student_id"])
+        if row is None:
+            if self._size == len(self._verified):
+                self._grow(max(1024, self._size * 2))
+            row = self._size
+            self._row[student["student_id"]] = row
+            self._size += 1
+
+        summary = compute_academic_summary(student)
+        for name in NUMERIC_COLUMNS:
+            value = summary[name]
+            self._columns[name][row] = np.nan if value is None else value
+        self._branch_codes[row] = self._encode_branch(
+            (student.get("basic_details") or {}).get("branch")
+        )
+        self._verified[row] = bool(student.get("is_verified"))
+
+    async def _reload(self):
+        self._reset()
+        async for student in student_collection.find({}, ANALYTICS_PROJECTION):
+            self._store(student)
+        self._loaded_at = time.monotonic()
+
+    async def _refresh_stale(self):
+        student_ids, self._stale = list(self._stale), set()
+        async for student in student_collection.find(
+            {"student_id": {"$in": student_ids}}, ANALYTICS_PROJECTION
+        ):
+            self._store(student)
+
+    async def refresh(self):
+        """
+        Bring the columns up to date: a full reload on first use or once
+        ANALYTICS_MAX_AGE_SECONDS have passed, otherwise only stale rows.
+        """
+        async with self._lock:
+            if (
+                self._loaded_at is None
+                or time.monotonic() - self._loaded_at > ANALYTICS_MAX_AGE_SECONDS
+            ):
+                await self._reload()
+            elif self._stale:
+                await self._refresh_stale()
+
+    def _mask(self, branch: str = None, is_verified: bool = None) -> np.ndarray:
+        mask = np.ones(self._size, dtype=bool)
+        if branch is not None:
+            code = self._branch_code.get(branch)
+            if code is None:
+                return np.zeros(self._size, dtype=bool)
+            mask &= self._branch_codes[: self._size] == code
+        if is_verified is not None:
+            mask &= self._verified[: self._size] == is_verified
+        return mask
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][: self._size]
+
+    def count_meeting(
+        self,
+        min_cgpa: float = None,
+        max_backlogs: int = None,
+        min_tenth: float = None,
+        min_twelfth: float = None,
+        branch: str = None,
+        is_verified: bool = None,
+    ) -> int:
+        """
+        Count students clearing every given threshold. Students missing a
+        thresholded value never qualify.
+        """
+        mask = self._mask(branch, is_verified)
+        if min_cgpa is not None:
+            mask &= self.column("average_cgpa") >= min_cgpa
+        if max_backlogs is not None:
+            mask &= self.column("total_backlogs") <= max_backlogs
+        if min_tenth is not None:
+            mask &= self.column("tenth_percentage") >= min_tenth
+        if min_twelfth is not None:
+            mask &= self.column("twelfth_percentage") >= min_twelfth
+        return int(np.count_nonzero(mask))
+
+    def percentiles(self, name: str, percentiles: list, branch: str = None) -> dict:
+        values = self.column(name)[self._mask(branch)]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {str(p): None for p in percentiles}
+        results = np.percentile(values, percentiles)
+        return {str(p): round(float(r), 2) for p, r in zip(percentiles, results)}
+
+    def branch_statistics(self, name: str = "average_cgpa") -> dict:
+        """
+        Per-branch count, mean and quartiles of a column.
+        """
+        values = self.column(name)
+        codes = self._branch_codes[: self._size]
+        present = ~np.isnan(values)
+        counts = np.bincount(codes, minlength=len(self._branches))
+        statistics = {}
+        for code, branch in enumerate(self._branches):
+            branch_values = values[(codes == code) & present]
+            stats = {"students": int(counts[code]), "with_data": len(branch_values)}
+            if len(branch_values):
+                p25, p50, p75 = np.percentile(branch_values, [25, 50, 75])
+                stats.update(
+                    mean=round(float(branch_values.mean()), 2),
+                    p25=round(float(p25), 2),
+                    median=round(float(p50), 2),
+                    p75=round(float(p75), 2),
+                )
+            statistics[branch] = stats
+        return statistics
+
+    def backlog_histogram(self, branch: str = None) -> dict:
+        backlogs = self.column("total_backlogs")[self._mask(branch)]
+        backlogs = backlogs[~np.isnan(backlogs)].astype(np.int64)
+        histogram = np.bincount(backlogs) if len(backlogs) else []
+        return {str(n): int(count) for n, count in enumerate(histogram) if count}
+
+    @property
+    def total(self) -> int:
+        return self._size
+
+
+student_analytics = StudentAnalytics()
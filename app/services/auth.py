@@ -0,0 +1,166 @@
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException, Request, Security
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.config.settings import required_setting
+from app.models.auth_model import Principal
+from app.services.token_cache import student_token_cache
+
+# Secret key for JWT
+SECRET_KEY = required_setting("JWT_SECRET_KEY")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def create_access_token(
+    data: dict, expires_delta: timedelta = None, token_type: str = "access"
+) -> str:
+    """
+    Generate a JWT.
+
+    Args:
+        data (dict): Data to include in the payload.
+        expires_delta (timedelta, optional): Token expiration duration.
+        token_type (str): "access" or "refresh".
+
+    Returns:
+        str: Encoded JWT token.
+    """
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (
+        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    # iat keeps sub-second precision, so a token issued right after a
+    # revocation (e.g. logging in again after logging out) is not caught by it
+    to_encode.update(
+        {
+            "exp": expire,
+            "iat": time.time(),
+            "type": token_type,
+            "jti": uuid.uuid4().hex,
+        }
+    )
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def issue_tokens(role: str, subject: str, **claims) -> dict:
+    """
+    Issue an access and a refresh token for a logged in student or admin.
+
+    Returns:
+        dict: access_token, refresh_token and token_type.
+    """
+    data = {"sub": subject, "role": role, **claims}
+    return {
+        "access_token": create_access_token(data),
+        "refresh_token": create_access_token(
+            data, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS), token_type="refresh"
+        ),
+        "token_type": "bearer",
+    }
+
+
+def decode_token(token: str, token_type: str = "access") -> Principal:
+    """
+    Decode and check a token entirely in memory.
+
+    Raises:
+        HTTPException: 401 if the token is expired, invalid, of the wrong
+        type or revoked.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    subject, role = payload.get("sub"), payload.get("role")
+    if not subject or role not in ("student", "admin"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("type", "access") != token_type:
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    if student_token_cache.is_revoked(
+        subject, payload.get("iat")
+    ) or student_token_cache.is_token_revoked(payload.get("jti")):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    return Principal(subject=subject, role=role, claims=payload)
+
+
+def revoke_tokens(subject: str):
+    """
+    Reject every access and refresh token issued to a student or admin so
+    far. The revocation list lives in memory, so it applies to the worker
+    that handled the request and is lost on restart.
+    """
+    student_token_cache.revoke(
+        subject, time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    )
+
+
+def revoke_token(principal: Principal):
+    """
+    Reject one token from now on, e.g. a refresh token that has been
+    exchanged. Like revoke_tokens, this is per worker and in memory.
+    """
+    jti = principal.claims.get("jti")
+    if jti:
+        student_token_cache.revoke_token(jti, principal.claims.get("exp", 0))
+
+
+async def get_current_principal(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme),
+) -> Principal:
+    """
+    FastAPI dependency that authenticates the bearer token and attaches the
+    principal to request.state.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = decode_token(credentials.credentials)
+    request.state.principal = principal
+    return principal
+
+
+async def require_admin(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if principal.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return principal
+
+
+def check_student_access(principal: Principal, student_id: str) -> Principal:
+    """
+    Allow admins and the student the data belongs to.
+
+    Raises:
+        HTTPException: 403 for any other student.
+    """
+    if principal.role != "admin" and principal.subject != student_id:
+        raise HTTPException(status_code=403, detail="Not allowed for this student")
+    return principal
+
+
+async def authorize_student(
+    student_id: str, principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    """
+    Dependency for routes taking a student_id path or query parameter.
+    """
+    return check_student_access(principal, student_id)
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import os
+import time
+
+from app.config.db import *
+from app.services.serialization import serialize_response
+
+# Rebuilds at least this often so writes made through other workers show up
+COMPANY_SNAPSHOT_MAX_AGE_SECONDS = int(
+    os.getenv("COMPANY_SNAPSHOT_MAX_AGE_SECONDS", 60)
+)
+# Serialized pages kept per snapshot
+COMPANY_PAGE_CACHE_SIZE = 256
+
+
+class CompanySnapshot:
+    """
+    Versioned in-memory copy of the companies collection.
+
+    The snapshot is rebuilt only after a company write (or once it is older
+    than COMPANY_SNAPSHOT_MAX_AGE_SECONDS). Its version and ETag are a hash
+    of the content, so every worker holding the same data hands out the
+    same ones, and a rebuild that finds no change keeps them. Serialized
+    pages are memoized until the content changes.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.etag = None
+        self.companies = []
+        self._built_at = None
+        self._stale = True
+        self._pages = {}
+
+    def invalidate(self):
+        """
+        Mark the snapshot stale; called by every endpoint that writes companies.
+        """
+        self._stale = True
+
+    def _expired(self) -> bool:
+        return (
+            self._stale
+            or self._built_at is None
+            or time.monotonic() - self._built_at > COMPANY_SNAPSHOT_MAX_AGE_SECONDS
+        )
+
+    async def refresh(self):
+        if not self._expired():
+            return
+        async with self._lock:
+            if not self._expired():
+                return
+            self._stale = False
+            companies = await companies_collection.find().to_list(None)
+            companies.sort(key=lambda c: (c.get("recruitmentDate") or "", c["_id"]))
+
+            etag = hashlib.sha1(serialize_response(companies)).hexdigest()
+            self._built_at = time.monotonic()
+            if etag == self.etag:
+                return
+            self.companies = companies
+            self.etag = etag
+            self._pages = {}
+
+    def page(
+        self,
+        status: str = None,
+        from_date: str = None,
+        to_date: str = None,
+        offset: int = 0,
+        limit: int = None,
+    ) -> tuple:
+        """
+        Filter and paginate the snapshot.
+
+        recruitmentDate is stored as an ISO date string, so date bounds are
+        compared as strings.
+
+        Returns:
+            tuple: (serialized response body, ETag for this page).
+        """
+        params = (status, from_date, to_date, offset, limit)
+        etag = '"{}-{}"'.format(
+            self.etag, hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+        )
+        if params in self._pages:
+            return self._pages[params], etag
+
+        companies = [
+            company
+            for company in self.companies
+            if (status is None or company.get("status") == status)
+            and (
+                from_date is None or (company.get("recruitmentDate") or "") >= from_date
+            )
+            and (to_date is None or (company.get("recruitmentDate") or "") <= to_date)
+        ]
+        end = None if limit is None else offset + limit
+        content = serialize_response(
+            {
+                "companies": companies[offset:end],
+                "total": len(companies),
+                "version": self.etag,
+            }
+        )
+        if len(self._pages) >= COMPANY_PAGE_CACHE_SIZE:
+            self._pages = {}
+        self._pages[params] = content
+        return content, etag
+
+
+company_snapshot = CompanySnapshot()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag, accepting
+    "*", comma separated lists and W/ prefixes as RFC 9110 requires.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,103 @@
+from pymongo import UpdateOne
+from app.config.db import *
+
+# Student fields the academic summary is derived from
+ACADEMIC_FIELDS = {"tenth_details": 1, "twelfth_details": 1, "semester_details": 1}
+
+
+def compute_academic_summary(student: dict) -> dict:
+    """
+    Derive the aggregates eligibility queries filter on from a student's
+    10th, 12th and semester details.
+
+    Args:
+        student (dict): Student document or profile data.
+
+    Returns:
+        dict: latest_cgpa, average_cgpa, total_backlogs, tenth_percentage
+        and twelfth_percentage (None where the data is missing).
+    """
+    semesters = sorted(
+        (
+            semester
+            for semester in student.get("semester_details") or []
+            if semester.get("cgpa") is not None
+        ),
+        key=lambda semester: semester.get("semester") or 0,
+    )
+    cgpas = [semester["cgpa"] for semester in semesters]
+
+    return {
+        "latest_cgpa": cgpas[-1] if cgpas else None,
+        "average_cgpa": round(sum(cgpas) / len(cgpas), 2) if cgpas else None,
+        "total_backlogs": sum(
+            semester.get("no_backlogs") or 0
+            for semester in student.get("semester_details") or []
+        ),
+        "tenth_percentage": (student.get("tenth_details") or {}).get("percentage"),
+        "twelfth_percentage": (student.get("twelfth_details") or {}).get("percentage"),
+    }
+
+
+async def refresh_academic_summary(student_id: str, student: dict = None):
+    """
+    Recompute and store the academic summary for one student. Call this
+    after any write that touches academic details; pass the updated
+    document's academic fields when the write already returned them.
+    """
+    if student is None:
+        student = await student_collection.find_one(
+            {"student_id": student_id}, ACADEMIC_FIELDS
+        )
+    if student:
+        await student_collection.update_one(
+            {"_id": student["_id"]},
+            {"$set": {"academic_summary": compute_academic_summary(student)}},
+        )
+
+
+async def rebuild_academic_summaries(batch_size: int = 1000) -> int:
+    """
+    Recompute the academic summary of every student in batched bulk writes,
+    e.g. to backfill documents written before summaries existed.
+
+    Returns:
+        int: Number of students updated.
+    """
+    updated = 0
+    batch = []
+    async for student in student_collection.find({}, ACADEMIC_FIELDS):
+        batch.append(
+            UpdateOne(
+                {"_id": student["_id"]},
+                {"$set": {"academic_summary": compute_academic_summary(student)}},
+            )
+        )
+        if len(batch) >= batch_size:
+            updated += (await student_collection.bulk_write(batch)).modified_count
+            batch = []
+    if batch:
+        updated += (await student_collection.bulk_write(batch)).modified_count
+    return updated
+
+
+def eligible_students_filter(eligibility: dict) -> dict:
+    """
+    Filter for students meeting a company's eligibility criteria. minScore
+    is compared with the average CGPA across semesters.
+    """
+    return {
+        "academic_summary.total_backlogs": {"$lte": eligibility["backlogsAllowed"]},
+        "academic_summary.average_cgpa": {"$gte": eligibility["minScore"]},
+    }
+
+
+def eligible_companies_filter(summary: dict) -> dict:
+    """
+    Filter for companies whose eligibility criteria a student's academic
+    summary meets.
+    """
+    return {
+        "eligibility.minScore": {"$lte": summary.get("average_cgpa") or 0},
+        "eligibility.backlogsAllowed": {"$gte": summary.get("total_backlogs") or 0},
+    }
@@ -0,0 +1,264 @@
+import bisect
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+# Set METRICS_ENABLED=0 to skip all recording
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Requests slower than this are logged with their MongoDB call breakdown
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", 1.0))
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+logger = logging.getLogger("app.metrics")
+
+# MongoDB calls made while handling the current request, or None outside one
+_request_db_calls = ContextVar("request_db_calls", default=None)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set, rendered in the Prometheus
+    text format. Observations happen on the event loop thread, so no lock
+    is taken.
+    """
+
+    def __init__(
+        self, name: str, description: str, labels: tuple, buckets=LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: tuple):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        for label_values, value in self._values.items():
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_slow_requests = Counter(
+    "http_slow_requests_total",
+    "Requests slower than SLOW_REQUEST_SECONDS.",
+    ("method", "route"),
+)
+mongodb_command_duration = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round-trip time by collection and command.",
+    ("collection", "command", "outcome"),
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash and verify time, including the wait for a pool worker.",
+    ("operation",),
+)
+upload_duration = Histogram(
+    "upload_duration_seconds",
+    "File upload time to the storage backend.",
+    ("backend", "outcome"),
+)
+rejected_requests = Counter(
+    "rejected_requests_total",
+    "Requests turned away by rate limits or concurrency caps.",
+    ("limit", "reason"),
+)
+METRICS = (
+    http_request_duration,
+    http_slow_requests,
+    rejected_requests,
+    mongodb_command_duration,
+    password_hash_duration,
+    upload_duration,
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Records every MongoDB command's duration, and adds it to the current
+    request's breakdown for the slow request log.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+
+    def started(self, event):
+        if not METRICS_ENABLED:
+            return
+        command = event.command
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        else:
+            collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        self._in_flight[(event.connection_id, event.request_id)] = collection
+
+    def _finished(self, event, outcome: str):
+        collection = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if collection is None:
+            return
+        seconds = event.duration_micros / 1e6
+        mongodb_command_duration.observe(
+            seconds, collection, event.command_name, outcome
+        )
+        calls = _request_db_calls.get()
+        if calls is not None:
+            calls.append((collection, event.command_name, seconds))
+
+    def succeeded(self, event):
+        self._finished(event, "success")
+
+    def failed(self, event):
+        self._finished(event, "failure")
+
+
+command_timer = CommandTimer()
+
+
+def _db_breakdown(calls: list) -> dict:
+    breakdown = {}
+    for collection, command, seconds in calls:
+        key = f"{collection}.{command}"
+        count, total = breakdown.get(key, (0, 0.0))
+        breakdown[key] = (count + 1, total + seconds)
+    return {
+        key: {"calls": count, "ms": round(total * 1000, 2)}
+        for key, (count, total) in breakdown.items()
+    }
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request by its route template (not the
+    raw path, so student IDs do not create new series). Server-sent event
+    streams stay open by design and are not timed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        event_stream = False
+        calls = []
+        token = _request_db_calls.set(calls)
+
+        async def send_with_status(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_db_calls.reset(token)
+            if not event_stream:
+                self._record(scope, status, time.perf_counter() - start, calls)
+
+    def _record(self, scope, status: int, elapsed: float, calls: list):
+        route = scope.get("route")
+        route = route.path if route is not None else "unmatched"
+        http_request_duration.observe(elapsed, scope["method"], route, str(status))
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            http_slow_requests.inc(scope["method"], route)
+            logger.warning(
+                "Slow request %s %s: %.3fs, status %s, %d DB calls (%.3fs): %s",
+                scope["method"],
+                route,
+                elapsed,
+                status,
+                len(calls),
+                sum(seconds for _, _, seconds in calls),
+                _db_breakdown(calls),
+            )
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+
+from pymongo.errors import OperationFailure
+
+from app.config.db import *
+from app.services.serialization import serialize_response
+
+logger = logging.getLogger("app.notifications")
+
+# Events buffered per connection before a slow client is asked to resync
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 100))
+# "local" fans out in-process; "change_stream" follows MongoDB so every worker
+# sees notifications sent through any other worker
+NOTIFICATION_HUB_BACKEND = os.getenv("NOTIFICATION_HUB_BACKEND", "local")
+# Wait before reopening a failed change stream, doubled up to the maximum
+CHANGE_STREAM_RETRY_SECONDS = float(os.getenv("CHANGE_STREAM_RETRY_SECONDS", 1))
+CHANGE_STREAM_MAX_RETRY_SECONDS = float(
+    os.getenv("CHANGE_STREAM_MAX_RETRY_SECONDS", 30)
+)
+# Server errors meaning the stream cannot be resumed from its last token
+CHANGE_STREAM_HISTORY_LOST = (260, 280, 286)
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+def format_event(notification: dict) -> str:
+    """
+    Format a notification as a server-sent event, encoded like the REST
+    responses so timestamps look the same on both.
+    """
+    payload = {
+        "type": notification.get("type", "notification"),
+        "notification_id": notification.get("_id"),
+        "message": notification.get("message"),
+        "timestamp": notification.get("timestamp"),
+    }
+    return f"data: {serialize_response(payload).decode()}\n\n"
+
+
+class NotificationHub:
+    """
+    In-process publish/subscribe hub for notification push connections.
+
+    Each subscriber gets a bounded queue. When a client falls behind and its
+    queue fills up, the backlog is dropped and replaced by a single resync
+    event, so one slow connection can never grow memory without bound or
+    stall the publisher; the client refetches /get-notifications instead.
+    """
+
+    def __init__(self, queue_size: int = NOTIFICATION_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self.dropped_events = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, student_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(student_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, student_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(student_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[student_id]
+
+    def _offer(self, queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped_events += queue.qsize()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+    def deliver(self, notification: dict):
+        """
+        Push a notification to the queues of its recipient, or to every
+        subscriber when it is a broadcast.
+        """
+        student_id = notification.get("student_id")
+        if student_id == "all":
+            targets = [q for queues in self._subscribers.values() for q in queues]
+        else:
+            targets = list(self._subscribers.get(student_id, ()))
+        for queue in targets:
+            self._offer(queue, notification)
+
+    def publish(self, notification: dict):
+        """
+        Called by send_notification after the notification is stored.
+        """
+        self.deliver(notification)
+
+    def resync_all(self):
+        """
+        Ask every subscriber to refetch its feed, e.g. after notifications
+        may have been missed.
+        """
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._offer(queue, RESYNC_EVENT)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class ChangeStreamNotificationHub(NotificationHub):
+    """
+    Hub fed by a MongoDB change stream on the notifications collection, so
+    pushes reach subscribers on every worker. Requires a replica set.
+    """
+
+    def __init__(self, queue_size: int = NOTIFICATION_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self._task = None
+
+    def publish(self, notification: dict):
+        # Delivery happens when the insert shows up on the change stream
+        pass
+
+    async def _watch(self):
+        """
+        Follow the change stream for the life of the app. When it fails, e.g.
+        on a failover or network error, the error is logged and the stream
+        is reopened from the last resume token with a growing delay. If it
+        cannot be resumed, it restarts from now and subscribers are told to
+        resync, as notifications may have been missed.
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+        delay = CHANGE_STREAM_RETRY_SECONDS
+        while True:
+            try:
+                async with await notifications_collection.watch(
+                    pipeline, resume_after=resume_token
+                ) as stream:
+                    delay = CHANGE_STREAM_RETRY_SECONDS
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.deliver(change["fullDocument"])
+            except Exception as e:
+                history_lost = (
+                    isinstance(e, OperationFailure)
+                    and e.code in CHANGE_STREAM_HISTORY_LOST
+                )
+                if history_lost and resume_token:
+                    logger.warning("Notification change stream lost its history: %s", e)
+                    resume_token = None
+                    self.resync_all()
+                    continue
+                logger.exception(
+                    "Notification change stream failed, reopening in %.0fs", delay
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CHANGE_STREAM_MAX_RETRY_SECONDS)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+if NOTIFICATION_HUB_BACKEND == "change_stream":
+    notification_hub = ChangeStreamNotificationHub()
+else:
+    notification_hub = NotificationHub()
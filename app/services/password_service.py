@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.services.metrics import password_hash_duration
+
+# Initialize the CryptContext with bcrypt hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so a thread pool is enough for most deployments.
+# Set PASSWORD_HASH_EXECUTOR=process to move hashing into separate processes.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+# Hashes allowed to run or wait for a worker before callers get a 503
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 4)
+)
+PASSWORD_HASH_RETRY_AFTER = os.getenv("PASSWORD_HASH_RETRY_AFTER", "1")
+
+if PASSWORD_HASH_EXECUTOR == "process":
+    _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+else:
+    _executor = ThreadPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+    )
+
+_pending = 0
+# Futures of callers waiting for the pool to drop below its pending limit
+_waiters = deque()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def _run_on_pool(func, *args, wait: bool = False):
+    """
+    Runs a bcrypt call on the worker pool. When the pool already has
+    PASSWORD_HASH_MAX_PENDING hashes in flight the call is rejected straight
+    away, or with wait=True queued until one finishes.
+
+    Raises:
+        HTTPException: 503 with a Retry-After header if the pool is saturated
+            and wait is False.
+    """
+    global _pending
+    while _pending >= PASSWORD_HASH_MAX_PENDING:
+        if not wait:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": PASSWORD_HASH_RETRY_AFTER},
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        _waiters.append(waiter)
+        await waiter
+
+    _pending += 1
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+        password_hash_duration.observe(
+            time.perf_counter() - start, func.__name__.lstrip("_")
+        )
+        while _waiters:
+            waiter = _waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+async def hash_password(password: str, wait: bool = False) -> str:
+    """
+    Hashes a plain-text password off the event loop.
+
+    Args:
+        password (str): Plain-text password.
+        wait (bool): Wait for pool capacity instead of raising a 503, for
+            background work such as bulk imports.
+
+    Returns:
+        str: Hashed password.
+    """
+    return await _run_on_pool(_hash, password, wait=wait)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a plain-text password against its hashed version off the event loop.
+
+    Args:
+        plain_password (str): Plain-text password.
+        hashed_password (str): Hashed password.
+
+    Returns:
+        bool: True if passwords match, False otherwise.
+    """
+    return await _run_on_pool(_verify, plain_password, hashed_password)
@@ -0,0 +1,125 @@
+import os
+import time
+from collections import OrderedDict
+
+# "memory" keeps entries per worker; "redis" shares them between workers
+PROFILE_CACHE_BACKEND = os.getenv("PROFILE_CACHE_BACKEND", "memory")
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", 5000))
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", 120))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Every cached serialization of a student profile, invalidated together
+PROFILE_VIEWS = ("view_profile", "student_detail")
+
+
+def profile_key(view: str, student_id: str) -> str:
+    return f"profile:{view}:{student_id}"
+
+
+class InMemoryProfileCache:
+    """
+    Per-worker LRU cache of serialized profile responses with a TTL.
+    """
+
+    def __init__(
+        self, max_size: int = PROFILE_CACHE_SIZE, ttl: int = PROFILE_CACHE_TTL_SECONDS
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._evict(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes):
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_size:
+            self._evict(next(iter(self._entries)))
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            if key in self._entries:
+                self._evict(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "memory_bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RedisProfileCache:
+    """
+    Profile cache shared by all workers through Redis, so an invalidation
+    on one worker is seen by every other. Needs the optional redis package.
+    """
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = PROFILE_CACHE_TTL_SECONDS):
+        import redis.asyncio
+
+        self._redis = redis.asyncio.from_url(url)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        value = await self._redis.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes):
+        await self._redis.set(key, value, ex=self.ttl)
+
+    async def delete(self, *keys: str):
+        await self._redis.delete(*keys)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+if PROFILE_CACHE_BACKEND == "redis":
+    profile_cache = RedisProfileCache()
+else:
+    profile_cache = InMemoryProfileCache()
+
+
+async def invalidate_profile(student_id: str):
+    """
+    Drop every cached view of a student's profile; call after any write to
+    the student document.
+    """
+    await profile_cache.delete(
+        *(profile_key(view, student_id) for view in PROFILE_VIEWS)
+    )
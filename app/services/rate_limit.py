@@ -0,0 +1,273 @@
+import math
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+from app.services.auth import decode_token
+from app.services.metrics import rejected_requests
+
+# Set RATE_LIMIT_ENABLED=0 to turn off rate limits and concurrency caps
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+# "memory" keeps buckets per worker; "redis" shares them between workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Buckets kept by the in-memory backend before the least recently used go
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# Only enable behind a proxy that sets X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR") == "1"
+
+# bcrypt-backed endpoints: login, signin and admin registration
+AUTH_RATE_PER_MINUTE = float(os.getenv("AUTH_RATE_PER_MINUTE", 20))
+AUTH_BURST = int(os.getenv("AUTH_BURST", 10))
+AUTH_MAX_CONCURRENT = int(os.getenv("AUTH_MAX_CONCURRENT", 32))
+# Endpoints that stream files to the storage backend, see UploadLimitMiddleware
+UPLOAD_RATE_PER_MINUTE = float(os.getenv("UPLOAD_RATE_PER_MINUTE", 10))
+UPLOAD_BURST = int(os.getenv("UPLOAD_BURST", 5))
+UPLOAD_MAX_CONCURRENT = int(os.getenv("UPLOAD_MAX_CONCURRENT", 16))
+
+
+class InMemoryRateLimiter:
+    """
+    Token buckets per key, local to the worker. The least recently used
+    buckets are dropped past RATE_LIMIT_MAX_KEYS; a dropped bucket is full
+    again, which only errs on the side of letting a request through.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """
+        Take cost tokens from the key's bucket; a cost of 0 only checks
+        that a token is available.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise seconds until a
+            token is available.
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= cost
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimiter:
+    """
+    Token buckets shared by all workers through Redis, updated atomically
+    by a Lua script. Needs the optional redis package.
+    """
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - cost
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL):
+        import redis.asyncio
+
+        self._redis = redis.asyncio.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    async def acquire(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        retry_after = await self._script(
+            keys=[f"ratelimit:{key}"], args=[rate, burst, time.time(), cost]
+        )
+        return float(retry_after)
+
+
+if RATE_LIMIT_BACKEND == "redis":
+    rate_limiter = RedisRateLimiter()
+else:
+    rate_limiter = InMemoryRateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _reject(status_code: int, detail: str, retry_after: float):
+    raise HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def _take_tokens(name: str, keys: list, rate: float, burst: int):
+    for key in keys:
+        retry_after = await rate_limiter.acquire(key, rate, burst)
+        if retry_after:
+            rejected_requests.inc(name, "rate_limit")
+            _reject(429, "Too many requests, please slow down", retry_after)
+
+
+def rate_limit(name: str, per_minute: float, burst: int):
+    """
+    Build a dependency enforcing a token bucket per client IP and, when an
+    earlier dependency authenticated the request, per principal.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when a bucket is empty.
+    """
+    rate = per_minute / 60
+
+    async def dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        keys = [f"{name}:ip:{client_ip(request)}"]
+        principal = getattr(request.state, "principal", None)
+        if principal is not None:
+            keys.append(f"{name}:{principal.role}:{principal.subject}")
+        await _take_tokens(name, keys, rate, burst)
+
+    return dependency
+
+
+async def check_failed_logins(role: str, subject: str):
+    """
+    Refuse to verify a password for an account whose failed-login bucket is
+    empty, without taking a token. Only wrong passwords take tokens, see
+    record_failed_login, so guessing one account's password from many
+    addresses is throttled while requests naming the account alone are not.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when the bucket is empty.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    retry_after = await rate_limiter.acquire(
+        f"login:{role}:{subject}", AUTH_RATE_PER_MINUTE / 60, AUTH_BURST, cost=0
+    )
+    if retry_after:
+        rejected_requests.inc("login", "rate_limit")
+        _reject(429, "Too many failed logins, please retry later", retry_after)
+
+
+async def record_failed_login(role: str, subject: str):
+    """
+    Take a token from the account's failed-login bucket after a wrong password.
+    """
+    if RATE_LIMIT_ENABLED:
+        await rate_limiter.acquire(
+            f"login:{role}:{subject}", AUTH_RATE_PER_MINUTE / 60, AUTH_BURST
+        )
+
+
+def concurrency_limit(name: str, limit: int, retry_after: float = 1):
+    """
+    Build a dependency capping the requests a worker handles at once on a
+    route, failing fast instead of queueing behind slow work.
+
+    Raises:
+        HTTPException: 503 with a Retry-After header when the cap is reached.
+    """
+    in_flight = 0
+
+    async def dependency():
+        nonlocal in_flight
+        if not RATE_LIMIT_ENABLED:
+            yield
+            return
+        if in_flight >= limit:
+            rejected_requests.inc(name, "concurrency")
+            _reject(503, "Server is busy, please retry shortly", retry_after)
+        in_flight += 1
+        try:
+            yield
+        finally:
+            in_flight -= 1
+
+    return dependency
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware applying the upload rate limits (per client IP and per
+    bearer token's principal) and concurrency cap to the given route paths.
+    FastAPI reads the whole request body before running dependencies, so as
+    dependencies these limits would only turn a multipart upload away after
+    it had been received and spooled to disk.
+    """
+
+    def __init__(self, app, paths: list):
+        self.app = app
+        self.paths = [compile_path(path)[0] for path in paths]
+        self.rate = UPLOAD_RATE_PER_MINUTE / 60
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not RATE_LIMIT_ENABLED
+            or not any(path.match(scope["path"]) for path in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await _take_tokens(
+                "upload", self._keys(Request(scope)), self.rate, UPLOAD_BURST
+            )
+            if self.in_flight >= UPLOAD_MAX_CONCURRENT:
+                rejected_requests.inc("upload", "concurrency")
+                _reject(503, "Server is busy, please retry shortly", 1)
+        except HTTPException as e:
+            response = JSONResponse(
+                {"detail": e.detail}, status_code=e.status_code, headers=e.headers
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _keys(self, request: Request) -> list:
+        keys = [f"upload:ip:{client_ip(request)}"]
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                principal = decode_token(token)
+            except HTTPException:
+                # The route's own authentication rejects the request
+                return keys
+            keys.append(f"upload:{principal.role}:{principal.subject}")
+        return keys
+
+
+auth_rate_limit = rate_limit("auth", AUTH_RATE_PER_MINUTE, AUTH_BURST)
+auth_concurrency_limit = concurrency_limit("auth", AUTH_MAX_CONCURRENT)
@@ -0,0 +1,36 @@
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """
+    Encoders for types orjson does not handle natively. datetime, date and
+    UUID are native; anything else goes through FastAPI's encoder.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    return jsonable_encoder(value, custom_encoder={ObjectId: str})
+
+
+def serialize_response(data) -> bytes:
+    """
+    Serialize a response body to JSON bytes, converting ObjectId and
+    datetime values, so routes can return MongoDB documents as they are.
+    """
+    return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+
+
+class AppJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. It is also the app's
+    default_response_class, but FastAPI still runs jsonable_encoder over a
+    dict a route returns before rendering it. Routes returning large
+    documents construct it directly to skip that pass.
+    """
+
+    def render(self, content) -> bytes:
+        return serialize_response(content)
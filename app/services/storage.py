@@ -0,0 +1,272 @@
+import asyncio
+import functools
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import cloudinary
+import cloudinary.uploader
+import cloudinary.utils
+
+from app.config.settings import required_setting
+from app.services.metrics import upload_duration
+
+# "cloudinary" in production; "local" writes files to LOCAL_STORAGE_ROOT so
+# uploads can be exercised and benchmarked offline
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary")
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "uploads")
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "/uploads")
+# Maximum uploads in flight across the worker, and per-file time limit
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", 4))
+UPLOAD_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_TIMEOUT_SECONDS", 60))
+# Signed direct uploads must be confirmed within this window
+UPLOAD_SIGNATURE_TTL_SECONDS = int(os.getenv("UPLOAD_SIGNATURE_TTL_SECONDS", 300))
+UPLOAD_SIGNING_SECRET = required_setting("UPLOAD_SIGNING_SECRET")
+
+
+def _sign(folder: str, public_id: str, expires: int, target: str = "") -> str:
+    message = f"{folder}/{public_id}:{expires}:{target}".encode()
+    return hmac.new(UPLOAD_SIGNING_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(
+    folder: str, public_id: str, expires: int, signature: str, target: str = ""
+) -> bool:
+    """
+    Check an upload signature issued by create_upload_ticket and that it
+    has not expired.
+    """
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(_sign(folder, public_id, expires, target), signature)
+
+
+class CloudinaryStorage:
+    """
+    Stores files on Cloudinary. The account is configured when the backend
+    is selected rather than when the database module is imported, from the
+    CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY and CLOUDINARY_API_SECRET
+    settings.
+    """
+
+    def __init__(self):
+        cloudinary.config(
+            cloud_name=required_setting("CLOUDINARY_CLOUD_NAME"),
+            api_key=required_setting("CLOUDINARY_API_KEY"),
+            api_secret=required_setting("CLOUDINARY_API_SECRET"),
+        )
+
+    def upload(
+        self, file, folder: str, resource_type: str = "auto", timeout: float = None
+    ) -> str:
+        # The HTTP timeout is what ends the worker thread; wait_for in
+        # upload_file only stops waiting for it
+        result = cloudinary.uploader.upload(
+            file, resource_type=resource_type, folder=folder, timeout=timeout
+        )
+        return result["secure_url"]
+
+    def sign_upload(
+        self, folder: str, public_id: str, expires: int, resource_type: str = "auto"
+    ) -> dict:
+        config = cloudinary.config()
+        fields = {
+            "folder": folder,
+            "public_id": public_id,
+            "timestamp": int(time.time()),
+        }
+        fields["signature"] = cloudinary.utils.api_sign_request(
+            fields, config.api_secret
+        )
+        fields["api_key"] = config.api_key
+        return {
+            "upload_url": cloudinary.utils.cloudinary_api_url(
+                "upload", resource_type=resource_type
+            ),
+            "fields": fields,
+        }
+
+    def owns_url(self, url: str, folder: str, public_id: str) -> bool:
+        """
+        Check a delivery URL of the form
+        https://res.cloudinary.com/<cloud>/<type>/upload/[v<n>/]<folder>/<id>[.<ext>]
+        for this account's cloud and exactly this folder and public ID.
+        """
+        parsed = urlsplit(url)
+        if (
+            parsed.scheme != "https"
+            or parsed.netloc != "res.cloudinary.com"
+            or parsed.query
+            or parsed.fragment
+        ):
+            return False
+        segments = parsed.path.split("/")[1:]
+        if (
+            len(segments) < 4
+            or segments[0] != cloudinary.config().cloud_name
+            or segments[1] not in ("image", "raw", "video")
+            or segments[2] != "upload"
+        ):
+            return False
+        path = segments[3:]
+        if re.fullmatch(r"v\d+", path[0]):
+            path = path[1:]
+        name, _, extension = path[-1].partition(".")
+        return (
+            path[:-1] == folder.split("/")
+            and name == public_id
+            and "." not in extension
+        )
+
+
+class LocalStorage:
+    """
+    Stand-in backend that copies files under a local directory.
+    """
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT, base_url: str = None):
+        self.root = root
+        self.base_url = base_url or LOCAL_STORAGE_BASE_URL
+
+    def upload(
+        self,
+        file,
+        folder: str,
+        resource_type: str = "auto",
+        timeout: float = None,
+        public_id: str = None,
+    ) -> str:
+        directory = os.path.join(self.root, folder)
+        os.makedirs(directory, exist_ok=True)
+        name = public_id or uuid.uuid4().hex
+        with open(os.path.join(directory, name), "wb") as destination:
+            shutil.copyfileobj(file, destination)
+        return f"{self.base_url}/{folder}/{name}"
+
+    def sign_upload(
+        self, folder: str, public_id: str, expires: int, resource_type: str = "auto"
+    ) -> dict:
+        return {
+            "upload_url": "/uploads/local",
+            "fields": {
+                "folder": folder,
+                "public_id": public_id,
+                "expires": expires,
+                "signature": _sign(folder, public_id, expires),
+            },
+        }
+
+    def owns_url(self, url: str, folder: str, public_id: str) -> bool:
+        return url == f"{self.base_url}/{folder}/{public_id}"
+
+
+if STORAGE_BACKEND == "local":
+    storage = LocalStorage()
+else:
+    storage = CloudinaryStorage()
+
+# One thread per upload slot. A slot is only freed when its thread returns,
+# so an upload that timed out still holds it and later uploads never queue
+# inside the executor behind it
+_upload_executor = ThreadPoolExecutor(
+    max_workers=UPLOAD_CONCURRENCY, thread_name_prefix="upload"
+)
+_upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+
+def _release_upload_slot(future: asyncio.Future):
+    _upload_semaphore.release()
+    if not future.cancelled():
+        # Nobody awaits an upload that timed out; mark its error as seen
+        future.exception()
+
+
+async def upload_file(file, folder: str, resource_type: str = "auto") -> str:
+    """
+    Upload a file to the configured storage backend without blocking the
+    event loop.
+
+    Args:
+        file: A readable binary file object, e.g. UploadFile.file.
+        folder (str): Destination folder on the backend.
+        resource_type (str): Cloudinary resource type.
+
+    Returns:
+        str: Public URL of the stored file.
+
+    Raises:
+        asyncio.TimeoutError: If the upload takes longer than UPLOAD_TIMEOUT_SECONDS.
+    """
+    await _upload_semaphore.acquire()
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    outcome = "failure"
+    try:
+        future = loop.run_in_executor(
+            _upload_executor,
+            functools.partial(
+                storage.upload,
+                file,
+                folder,
+                resource_type,
+                timeout=UPLOAD_TIMEOUT_SECONDS,
+            ),
+        )
+    except BaseException:
+        _upload_semaphore.release()
+        raise
+    future.add_done_callback(_release_upload_slot)
+    try:
+        url = await asyncio.wait_for(
+            asyncio.shield(future), timeout=UPLOAD_TIMEOUT_SECONDS
+        )
+        outcome = "success"
+        return url
+    finally:
+        upload_duration.observe(time.perf_counter() - start, STORAGE_BACKEND, outcome)
+
+
+def create_upload_ticket(folder: str, target: str, resource_type: str = "auto") -> dict:
+    """
+    Issue short-lived parameters that let a client upload a file straight to
+    the storage backend instead of streaming it through the API.
+
+    Args:
+        folder (str): Destination folder on the backend.
+        target (str): What the file is for, e.g. "student:<student_id>". The
+            upload_token is only accepted when confirming for this target.
+        resource_type (str): Cloudinary resource type.
+
+    Returns:
+        dict: Where and how to upload, plus the upload_token the client sends
+        back to the confirm endpoint together with the resulting URL.
+    """
+    public_id = uuid.uuid4().hex
+    expires = int(time.time()) + UPLOAD_SIGNATURE_TTL_SECONDS
+    ticket = storage.sign_upload(folder, public_id, expires, resource_type)
+    ticket["upload_token"] = (
+        f"{public_id}.{expires}.{_sign(folder, public_id, expires, target)}"
+    )
+    ticket["expires"] = expires
+    return ticket
+
+
+def verify_uploaded_url(folder: str, target: str, upload_token: str, url: str) -> bool:
+    """
+    Check that a URL reported by a client is the file uploaded with a still
+    valid upload_token issued for this folder and target.
+    """
+    try:
+        public_id, expires, signature = upload_token.split(".")
+        expires = int(expires)
+    except ValueError:
+        return False
+    if not verify_signature(folder, public_id, expires, signature, target):
+        return False
+    return storage.owns_url(url, folder, public_id)
@@ -0,0 +1,122 @@
+import csv
+import io
+import os
+import tempfile
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config.db import *
+from app.models.pms_model import BasicDetails, TenthDetails, TwelfthDetails
+from app.services.serialization import serialize_response
+
+# Documents fetched from MongoDB per cursor batch
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Serialized bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Nested documents flattened into one column per sub-field for tabular formats
+NESTED_FIELD_MODELS = {
+    "basic_details": BasicDetails,
+    "tenth_details": TenthDetails,
+    "twelfth_details": TwelfthDetails,
+}
+
+
+def export_columns(fields: list) -> list:
+    """
+    Tabular column names for the projected fields. Nested details become
+    dotted columns; semester_details stays a single JSON-encoded column.
+    """
+    columns = []
+    for field in fields:
+        model = NESTED_FIELD_MODELS.get(field)
+        if model is None:
+            columns.append(field)
+        else:
+            columns.extend(f"{field}.{sub_field}" for sub_field in model.model_fields)
+    return columns
+
+
+def export_row(student: dict, columns: list) -> list:
+    row = []
+    for column in columns:
+        field, _, sub_field = column.partition(".")
+        value = student.get(field)
+        if sub_field:
+            value = (value or {}).get(sub_field)
+        elif isinstance(value, (list, dict)):
+            value = serialize_response(value).decode()
+        row.append(value)
+    return row
+
+
+def _student_cursor(query: dict, projection: dict):
+    return student_collection.find(
+        query, {**projection, "_id": 0}, batch_size=EXPORT_BATCH_SIZE
+    ).sort("_id", 1)
+
+
+async def _stream_ndjson(query: dict, projection: dict):
+    buffer = bytearray()
+    async for student in _student_cursor(query, projection):
+        buffer += serialize_response(student)
+        buffer += b"\n"
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _stream_csv(query: dict, projection: dict):
+    columns = export_columns(list(projection))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for student in _student_cursor(query, projection):
+        writer.writerow(export_row(student, columns))
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _stream_xlsx(query: dict, projection: dict):
+    """
+    XLSX is a zip archive that can only be sent once complete, so rows are
+    written with openpyxl's write-only mode (which spills to disk) and the
+    finished file is streamed from a temporary file.
+    """
+    from openpyxl import Workbook
+
+    columns = export_columns(list(projection))
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Students")
+    sheet.append(columns)
+    async for student in _student_cursor(query, projection):
+        sheet.append(export_row(student, columns))
+
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while chunk := await run_in_threadpool(output.read, EXPORT_CHUNK_BYTES):
+            yield chunk
+
+
+def stream_students(query: dict, projection: dict, file_format: str):
+    """
+    Return an async iterator of encoded chunks for the matching students.
+    """
+    if file_format == "xlsx":
+        return _stream_xlsx(query, projection)
+    if file_format == "ndjson":
+        return _stream_ndjson(query, projection)
+    return _stream_csv(query, projection)
@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+from pymongo import ReturnDocument
+
+from app.config.db import *
+
+STUDENT_ID_PREFIX = "SSGI20"
+# Numbers start here so IDs keep the existing 12 character format
+STUDENT_ID_OFFSET = 100000
+# Numbers available before the format would need a seventh digit
+STUDENT_ID_CAPACITY = 1000000 - STUDENT_ID_OFFSET
+# IDs reserved per round-trip to the counter document
+STUDENT_ID_BLOCK_SIZE = int(os.getenv("STUDENT_ID_BLOCK_SIZE", 50))
+
+
+class StudentIdAllocator:
+    """
+    Hands out unique student IDs from blocks reserved on an atomic counter.
+
+    Each worker reserves STUDENT_ID_BLOCK_SIZE numbers at a time with a
+    single $inc on the counter document, so IDs are unique across any number
+    of uvicorn workers. Within a block, allocation is a plain increment on
+    the event loop thread and needs no lock or database call; only fetching
+    the next block is serialized.
+
+    Students registered before the allocator existed got random numbers
+    from the same range, so an allocated ID can already be taken; callers
+    retry with the next one when the insert hits the unique index.
+    """
+
+    def __init__(
+        self, name: str = "student_id", block_size: int = STUDENT_ID_BLOCK_SIZE
+    ):
+        self.name = name
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve_block(self):
+        counter = await counters_collection.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"value": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._end = counter["value"]
+        self._next = self._end - self.block_size
+
+    async def allocate_number(self) -> int:
+        while self._next >= self._end:
+            async with self._lock:
+                if self._next >= self._end:
+                    await self._reserve_block()
+        number = self._next
+        if number >= STUDENT_ID_CAPACITY:
+            raise RuntimeError(
+                f"All {STUDENT_ID_CAPACITY} student IDs have been allocated; "
+                f"{STUDENT_ID_PREFIX} IDs cannot grow past 12 characters"
+            )
+        self._next += 1
+        return number
+
+    async def allocate(self) -> str:
+        """
+        Returns:
+            str: The next student ID, e.g. "SSGI20100042".
+
+        Raises:
+            RuntimeError: If the 12 character ID range is used up.
+        """
+        return f"{STUDENT_ID_PREFIX}{STUDENT_ID_OFFSET + await self.allocate_number()}"
+
+
+student_id_allocator = StudentIdAllocator()
@@ -0,0 +1,261 @@
+import asyncio
+import csv
+import json
+import re
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.config.db import *
+from app.models.pms_model import AddStudent, StudentDetails
+from app.services.eligibility import compute_academic_summary
+from app.services.password_service import PASSWORD_HASH_WORKERS, hash_password
+from app.services.student_id_allocator import student_id_allocator
+
+# Rows validated, hashed and written per insert_many
+IMPORT_BATCH_SIZE = 500
+# Per-row errors returned in the response; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+# Fresh student IDs tried for a row whose ID is already taken
+STUDENT_ID_ATTEMPTS = 3
+
+DETAIL_FIELDS = (
+    "basic_details",
+    "tenth_details",
+    "twelfth_details",
+    "semester_details",
+)
+
+
+def validate_new_student(student: AddStudent):
+    """
+    Checks applied to every new student, whether signing in or imported.
+
+    Raises:
+        HTTPException: If the email or contact number is invalid.
+    """
+    # Validate email format
+    if not re.search(r"(\w{1,})@([a-z]+).([a-z]+)", student.email):
+        raise HTTPException(status_code=400, detail="Invalid Email Address")
+
+    # Validate contact number length (e.g., must be 10 digits)
+    if len(student.contact) != 10 or not student.contact.isdigit():
+        raise HTTPException(
+            status_code=400, detail="Invalid Contact Number. Must be 10 digits."
+        )
+
+
+def build_new_student(student: AddStudent, hashed_password: str) -> dict:
+    return {
+        "name": student.name,
+        "email": student.email,
+        "password": hashed_password,  # Store the hashed password
+        "phone": student.contact,
+        "is_verified": False,
+    }
+
+
+async def create_read_markers(student_ids: list):
+    """
+    Start new students' notification read markers at the current broadcast
+    count, so broadcasts sent before they registered are not counted as
+    unread. Existing markers are left as they are.
+    """
+    if not student_ids:
+        return
+    broadcast_marker = await notification_reads_collection.find_one(
+        {"student_id": "all"}, {"broadcast_count": 1}
+    )
+    broadcasts_read = (broadcast_marker or {}).get("broadcast_count", 0)
+    await notification_reads_collection.bulk_write(
+        [
+            UpdateOne(
+                {"student_id": student_id},
+                {
+                    "$setOnInsert": {
+                        "unread_count": 0,
+                        "broadcasts_read": broadcasts_read,
+                    }
+                },
+                upsert=True,
+            )
+            for student_id in student_ids
+        ],
+        ordered=False,
+    )
+
+
+async def iter_lines(stream):
+    """
+    Split an async byte stream into decoded lines, holding at most one
+    partial line in memory.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_rows(stream, file_format: str):
+    """
+    Yield (row number, dict) pairs from a CSV (with a header line) or NDJSON
+    stream. Rows that cannot be parsed are yielded as (row number, error).
+    CSV fields may not contain line breaks.
+    """
+    header = None
+    row_number = 0
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        if file_format == "csv" and header is None:
+            header = next(csv.reader([line]))
+            continue
+        row_number += 1
+        try:
+            if file_format == "csv":
+                yield row_number, dict(zip(header, next(csv.reader([line]))))
+            else:
+                yield row_number, json.loads(line)
+        except (ValueError, StopIteration) as e:
+            yield row_number, ValueError(f"Unparseable row: {e}")
+
+
+def _duplicate_fields(write_error: dict) -> list:
+    """
+    Fields of the unique index a bulk write error violated.
+    """
+    key_pattern = write_error.get("keyPattern")
+    if key_pattern:
+        return list(key_pattern)
+    # Older servers only name the key in the message
+    errmsg = write_error.get("errmsg", "")
+    return [field for field in ("student_id", "email") if field in errmsg]
+
+
+def _parse_row(row: dict):
+    """
+    Validate one row with the AddStudent model, plus StudentDetails when the
+    row carries academic details (NDJSON only).
+    """
+    student = AddStudent.model_validate(row)
+    validate_new_student(student)
+    details = None
+    if any(row.get(field) for field in DETAIL_FIELDS):
+        details = StudentDetails.model_validate(row).model_dump()
+    return student, details
+
+
+class StudentImport:
+    """
+    Validates, hashes and inserts streamed rows in batches, collecting
+    per-row errors.
+    """
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.student_ids = []
+        self._hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+
+    def _error(self, row_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    async def _hash(self, password: str) -> str:
+        # Stay within the pool's capacity so interactive logins are not
+        # rejected, and wait for room instead of failing when it is busy
+        async with self._hash_slots:
+            return await hash_password(password, wait=True)
+
+    async def _insert(self, batch: list, documents: list) -> list:
+        """
+        Insert a batch, giving rows whose student_id is already taken (by an
+        ID issued before the counter existed) a fresh ID and trying again.
+
+        Returns:
+            list: Student IDs of the inserted rows.
+        """
+        pending = list(range(len(documents)))
+        inserted = []
+        for attempt in range(STUDENT_ID_ATTEMPTS):
+            failed = {}
+            try:
+                await student_collection.insert_many(
+                    [documents[index] for index in pending], ordered=False
+                )
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed[pending[write_error["index"]]] = _duplicate_fields(
+                        write_error
+                    )
+
+            inserted.extend(index for index in pending if index not in failed)
+            pending = []
+            for index, fields in failed.items():
+                if fields == ["student_id"] and attempt + 1 < STUDENT_ID_ATTEMPTS:
+                    documents[index][
+                        "student_id"
+                    ] = await student_id_allocator.allocate()
+                    pending.append(index)
+                else:
+                    key = ", ".join(fields) or "document"
+                    self._error(batch[index][0], f"Duplicate {key}")
+            if not pending:
+                break
+        return [documents[index]["student_id"] for index in sorted(inserted)]
+
+    async def _write_batch(self, batch: list):
+        passwords = await asyncio.gather(
+            *(self._hash(student.password) for _, student, _ in batch)
+        )
+        documents = []
+        for (row_number, student, details), hashed_password in zip(batch, passwords):
+            document = build_new_student(student, hashed_password)
+            document["student_id"] = await student_id_allocator.allocate()
+            if details:
+                document.update(details)
+                document["academic_summary"] = compute_academic_summary(details)
+            documents.append(document)
+
+        student_ids = await self._insert(batch, documents)
+        await create_read_markers(student_ids)
+        self.imported += len(student_ids)
+        self.student_ids.extend(student_ids)
+
+    async def run(self, stream, file_format: str) -> dict:
+        batch = []
+        async for row_number, row in iter_rows(stream, file_format):
+            if isinstance(row, Exception):
+                self._error(row_number, str(row))
+                continue
+            try:
+                student, details = _parse_row(row)
+            except ValidationError as e:
+                error = e.errors(include_url=False)[0]
+                field = ".".join(str(part) for part in error["loc"])
+                self._error(row_number, f"{field}: {error['msg']}")
+                continue
+            except HTTPException as e:
+                self._error(row_number, e.detail)
+                continue
+
+            batch.append((row_number, student, details))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await self._write_batch(batch)
+                batch = []
+        if batch:
+            await self._write_batch(batch)
+
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
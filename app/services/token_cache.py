@@ -0,0 +1,103 @@
+import os
+import time
+from collections import OrderedDict
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+
+
+class ValidatedSubjectCache:
+    """
+    LRU cache of token subjects recently confirmed to exist in the database.
+
+    An entry lives for TOKEN_CACHE_TTL_SECONDS but never past the expiry of
+    the token that validated it. The revocation list, filled by /logout and
+    the admin revoke endpoint, rejects tokens issued before a subject was
+    revoked, whether or not it is cached. Single tokens, such as exchanged
+    refresh tokens, are revoked by their jti until they expire.
+    """
+
+    def __init__(
+        self, max_size: int = TOKEN_CACHE_SIZE, ttl: int = TOKEN_CACHE_TTL_SECONDS
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._revoked = {}
+        self._revoked_tokens = {}
+        self.hits = 0
+        self.misses = 0
+        self.revoked_hits = 0
+
+    def get(self, subject: str) -> bool:
+        """
+        Return True if the subject was validated recently and the entry has
+        not expired.
+        """
+        valid_until = self._entries.get(subject)
+        if valid_until is None or valid_until < time.time():
+            if valid_until is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return False
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return True
+
+    def put(self, subject: str, token_exp: float):
+        self._entries[subject] = min(time.time() + self.ttl, token_exp)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revoke(self, subject: str, until: float):
+        """
+        Reject every token for the subject issued before now. The entry is
+        kept until `until`, the expiry of the longest-lived token issued so far.
+        """
+        self._entries.pop(subject, None)
+        self._revoked[subject] = (time.time(), until)
+
+    def is_revoked(self, subject: str, issued_at: float = None) -> bool:
+        revocation = self._revoked.get(subject)
+        if revocation is None:
+            return False
+        revoked_at, until = revocation
+        if until < time.time():
+            del self._revoked[subject]
+            return False
+        if issued_at is None or issued_at <= revoked_at:
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def revoke_token(self, jti: str, until: float):
+        """
+        Reject the token with this jti until `until`, its expiry.
+        """
+        now = time.time()
+        # Expired tokens are rejected anyway, so their entries can go
+        for expired in [j for j, exp in self._revoked_tokens.items() if exp < now]:
+            del self._revoked_tokens[expired]
+        self._revoked_tokens[jti] = until
+
+    def is_token_revoked(self, jti: str = None) -> bool:
+        if jti is None or jti not in self._revoked_tokens:
+            return False
+        self.revoked_hits += 1
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "revoked_subjects": len(self._revoked),
+            "revoked_tokens": len(self._revoked_tokens),
+            "revoked_hits": self.revoked_hits,
+        }
+
+
+student_token_cache = ValidatedSubjectCache()
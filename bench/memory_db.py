@@ -0,0 +1,29 @@
+"""
+In-memory stand-in for MongoDB, used by the tests and by benchmark runs
+without --mongo-url. Needs mongomock-motor (requirements-dev.txt).
+"""
+
+import asyncio
+
+import mongomock_motor
+
+from app.config import db
+
+
+def _patch_aggregate():
+    # pymongo's async API returns aggregate cursors from a coroutine
+    aggregate = mongomock_motor.AsyncMongoMockCollection.aggregate
+    if not asyncio.iscoroutinefunction(aggregate):
+
+        async def awaitable_aggregate(self, *args, **kwargs):
+            return aggregate(self, *args, **kwargs)
+
+        mongomock_motor.AsyncMongoMockCollection.aggregate = awaitable_aggregate
+
+
+def install_memory_client():
+    """
+    Point the app at a new, empty in-memory database.
+    """
+    _patch_aggregate()
+    db.set_client(mongomock_motor.AsyncMongoMockClient())
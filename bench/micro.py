@@ -0,0 +1,593 @@
+"""
+Microbenchmarks for single code paths, complementing the scenario load
+tests in bench.run. Each benchmark reports latency per call and the
+collection operations (database round-trips) each call issued.
+
+Runs in-process like bench.run: on the in-memory Mongo stand-in by
+default, or against a local mongod with --mongo-url. The stand-in has no
+indexes, so compare indexed and scanning paths against a mongod. Rate
+limits are off, as the benchmarks time code paths rather than admission
+control.
+
+    python -m bench.micro
+    python -m bench.micro --benchmark verify_token --calls 2000
+    python -m bench.micro --benchmark eligibility --students 5000
+    python -m bench.micro --benchmark blocking_driver --concurrency 100
+    python -m bench.micro --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import inspect
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import bson
+import numpy as np
+
+from bench.run import (
+    BENCH_ADMIN_PASSWORD,
+    _client_address,
+    _post_until_accepted,
+    _student_details,
+    admin_login,
+    open_client,
+)
+
+# Documents per insert_many when filling collections directly
+INSERT_BATCH_SIZE = 1000
+
+
+class OperationCounter:
+    """
+    Counts the collection operations the app issues through its
+    LazyCollection handles. Fetching further batches of an open cursor is
+    not counted.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def install(self):
+        from app.config.db import LazyCollection
+
+        resolve = LazyCollection.__getattr__
+
+        def counting(collection, attribute):
+            value = resolve(collection, attribute)
+            if callable(value):
+                self.count += 1
+            return value
+
+        LazyCollection.__getattr__ = counting
+
+
+operations = OperationCounter()
+
+
+async def _run_before(before):
+    if before:
+        result = before()
+        if inspect.isawaitable(result):
+            await result
+
+
+async def measure(
+    label: str, calls: int, call, before=None, warmup: int = 50, detail: str = ""
+) -> dict:
+    """
+    Await call() `calls` times, running before() (a function or coroutine
+    function) untimed ahead of each, after up to `warmup` untimed calls.
+    """
+    for _ in range(min(calls, warmup)):
+        await _run_before(before)
+        await call()
+    latencies = []
+    db_operations = 0
+    for _ in range(calls):
+        await _run_before(before)
+        start_count = operations.count
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+        db_operations += operations.count - start_count
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    return {
+        "benchmark": label,
+        "calls": calls,
+        "mean_ms": round(float(np.mean(latencies)) * 1000, 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "db_ops_per_call": round(db_operations / calls, 2),
+        "detail": detail,
+    }
+
+
+async def insert_documents(collection, count: int, make):
+    """
+    Insert make(index) for every index below count, straight into a
+    collection and without going through the API.
+    """
+    for offset in range(0, count, INSERT_BATCH_SIZE):
+        await collection.insert_many(
+            [
+                make(index)
+                for index in range(offset, min(offset + INSERT_BATCH_SIZE, count))
+            ],
+            ordered=False,
+        )
+
+
+async def stored_size(collection, query: dict) -> tuple:
+    """
+    Returns:
+        tuple: (documents, BSON bytes) matching the query.
+    """
+    documents = size = 0
+    async for document in collection.find(query):
+        documents += 1
+        size += len(bson.encode(document))
+    return documents, size
+
+
+async def register_student(client, index: int = 0) -> tuple:
+    """
+    Sign in and log in a student.
+
+    Returns:
+        tuple: (student_id, access token, request headers)
+    """
+    address = _client_address(index)
+    password = f"password-{index}"
+    response = await _post_until_accepted(
+        client,
+        "/student-signin",
+        json={
+            "name": f"Student {index}",
+            "email": f"micro{index}-{time.time_ns()}@bench.com",
+            "contact": "9876543210",
+            "password": password,
+        },
+        headers=address,
+    )
+    student_id = response.json()["student_id"]
+    response = await _post_until_accepted(
+        client,
+        "/student-login",
+        json={"student_id": student_id, "password": password},
+        headers=address,
+    )
+    token = response.json()["access_token"]
+    return student_id, token, {"Authorization": f"Bearer {token}", **address}
+
+
+async def verify_token(client, args) -> list:
+    """
+    GET /student/verify-token with a warm validation cache, against the
+    previous path that looks the student up on every call (the cache is
+    cleared before each call).
+    """
+    from app.services.token_cache import student_token_cache
+
+    _, token, headers = await register_student(client)
+    url = f"/student/verify-token/{token}"
+
+    async def call():
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+
+    return [
+        await measure(
+            "verify-token uncached",
+            args.calls,
+            call,
+            before=student_token_cache._entries.clear,
+        ),
+        await measure("verify-token cached", args.calls, call),
+    ]
+
+
+async def broadcasts(client, args) -> list:
+    """
+    POST /send-notification to "all" with one broadcast document, against
+    the previous model that read every student ID and wrote one notification
+    document per student, over --students students. Reports write latency
+    and the documents and bytes each broadcast stores.
+    """
+    from app.config.db import (
+        LazyCollection,
+        notifications_collection,
+        student_collection,
+    )
+
+    run_id = uuid.uuid4().hex[:8]
+    await insert_documents(
+        student_collection,
+        args.students,
+        lambda index: {
+            "student_id": f"BCAST{run_id}{index:07d}",
+            "email": f"broadcast{index}-{run_id}@bench.com",
+        },
+    )
+    admin_headers = await admin_login(client, args)
+    fan_out_collection = LazyCollection(f"bench_fan_out_{run_id}")
+
+    async def fan_out():
+        # send_notification before broadcasts were stored once
+        notification = {"message": "Drive update", "timestamp": datetime.utcnow()}
+        students = await student_collection.find({}, {"student_id": 1}).to_list(None)
+        await fan_out_collection.insert_many(
+            [{**notification, "student_id": s["student_id"]} for s in students]
+        )
+
+    async def broadcast():
+        response = await client.post(
+            "/send-notification",
+            json={"message": "Drive update", "student_id": "all"},
+            headers=admin_headers,
+        )
+        response.raise_for_status()
+
+    async def written_by(call, collection, query: dict) -> str:
+        documents, size = await stored_size(collection, query)
+        await call()
+        after_documents, after_size = await stored_size(collection, query)
+        return (
+            f"{after_documents - documents} docs, "
+            f"{(after_size - size) / 1024:.1f} KiB per broadcast"
+        )
+
+    calls = min(args.calls, args.slow_calls)
+    fan_out_stored = await written_by(fan_out, fan_out_collection, {})
+    results = [
+        await measure(
+            f"broadcast fan-out-on-write ({args.students} students)",
+            calls,
+            fan_out,
+            before=lambda: fan_out_collection.delete_many({}),
+            warmup=1,
+            detail=fan_out_stored,
+        ),
+    ]
+    await fan_out_collection.drop()
+    broadcast_stored = await written_by(
+        broadcast, notifications_collection, {"student_id": "all"}
+    )
+    results.append(
+        await measure(
+            f"broadcast single document ({args.students} students)",
+            calls,
+            broadcast,
+            detail=broadcast_stored,
+        )
+    )
+    return results
+
+
+async def eligibility(client, args) -> list:
+    """
+    Eligible students for a company and eligible companies for a student at
+    --students students and --companies companies, through the indexed
+    academic summary queries, against the previous approach of reading
+    every document and filtering in Python.
+    """
+    from app.config.db import companies_collection, student_collection
+    from app.services.eligibility import ACADEMIC_FIELDS, compute_academic_summary
+
+    run_id = uuid.uuid4().hex[:8]
+
+    def make_student(index: int) -> dict:
+        details = _student_details(index)
+        return {
+            "student_id": f"ELIG{run_id}{index:07d}",
+            "email": f"eligibility{index}-{run_id}@bench.com",
+            **details,
+            "academic_summary": compute_academic_summary(details),
+        }
+
+    def make_company(index: int) -> dict:
+        rng = random.Random(index)
+        return {
+            "name": f"Company {index}",
+            "status": "Upcoming",
+            "eligibility": {
+                "minScore": rng.randint(6, 8),
+                "backlogsAllowed": rng.randint(0, 1),
+            },
+        }
+
+    await insert_documents(student_collection, args.students, make_student)
+    await insert_documents(companies_collection, args.companies, make_company)
+    company_ids = [
+        str(company["_id"])
+        for company in await companies_collection.find({}, {"_id": 1}).to_list(None)
+    ]
+    admin_headers = await admin_login(client, args)
+    student_id, _, headers = await register_student(client)
+    response = await client.post(
+        "/student-detail",
+        params={"student_id": student_id},
+        json=_student_details(0),
+        headers=headers,
+    )
+    response.raise_for_status()
+
+    async def eligible_students():
+        response = await client.get(
+            f"/companies/{random.choice(company_ids)}/eligible-students",
+            headers=admin_headers,
+        )
+        response.raise_for_status()
+
+    async def eligible_students_scan():
+        company = await companies_collection.find_one(
+            {"_id": bson.ObjectId(random.choice(company_ids))}, {"eligibility": 1}
+        )
+        eligibility = company["eligibility"]
+        eligible = []
+        async for student in student_collection.find({}, ACADEMIC_FIELDS):
+            summary = compute_academic_summary(student)
+            if (
+                summary["average_cgpa"] is not None
+                and summary["average_cgpa"] >= eligibility["minScore"]
+                and summary["total_backlogs"] <= eligibility["backlogsAllowed"]
+            ):
+                eligible.append(student)
+
+    async def eligible_companies():
+        response = await client.get(
+            f"/eligible-companies/{student_id}", headers=headers
+        )
+        response.raise_for_status()
+
+    async def eligible_companies_scan():
+        student = await student_collection.find_one(
+            {"student_id": student_id}, ACADEMIC_FIELDS
+        )
+        summary = compute_academic_summary(student)
+        [
+            company
+            async for company in companies_collection.find({})
+            if company["eligibility"]["minScore"] <= summary["average_cgpa"]
+            and company["eligibility"]["backlogsAllowed"] >= summary["total_backlogs"]
+        ]
+
+    scale = f"{args.students} students x {args.companies} companies"
+    calls = min(args.calls, args.slow_calls)
+    return [
+        await measure(
+            "eligible students, indexed", calls, eligible_students, detail=scale
+        ),
+        await measure(
+            "eligible students, Python scan",
+            calls,
+            eligible_students_scan,
+            warmup=1,
+            detail=scale,
+        ),
+        await measure("eligible companies, indexed", args.calls, eligible_companies),
+        await measure(
+            "eligible companies, Python scan", args.calls, eligible_companies_scan
+        ),
+    ]
+
+
+async def round_trips(client, args) -> list:
+    """
+    Latency and database operations per call of the student write paths,
+    plus the find-then-update pattern they used to follow against the
+    single conditional write that replaced it.
+    """
+    from app.config.db import student_collection
+
+    admin_headers = await admin_login(client, args)
+    student_id, _, headers = await register_student(client)
+    params = {"student_id": student_id}
+    signins = iter(range(1, args.calls + args.slow_calls + 2))
+
+    async def signin():
+        index = next(signins)
+        response = await client.post(
+            "/student-signin",
+            json={
+                "name": f"Student {index}",
+                "email": f"round-trips{index}-{time.time_ns()}@bench.com",
+                "contact": "9876543210",
+                "password": f"password-{index}",
+            },
+        )
+        response.raise_for_status()
+
+    async def student_detail():
+        response = await client.post(
+            "/student-detail", params=params, json=_student_details(0), headers=headers
+        )
+        response.raise_for_status()
+
+    async def update_profile():
+        response = await client.put(
+            "/update-profile",
+            params=params,
+            json={"basic_details": {"father_name": f"Father {random.random()}"}},
+            headers=headers,
+        )
+        response.raise_for_status()
+
+    async def upload_marksheets():
+        response = await client.put(
+            "/upload-marksheets",
+            params=params,
+            files=[
+                ("tenth_marksheet", ("10th.pdf", io.BytesIO(b"%PDF-1.4"))),
+                ("twelfth_marksheet", ("12th.pdf", io.BytesIO(b"%PDF-1.4"))),
+                ("semester_marksheets", ("sem1.pdf", io.BytesIO(b"%PDF-1.4"))),
+            ],
+            headers=headers,
+        )
+        response.raise_for_status()
+
+    async def verify_student():
+        response = await client.put(
+            f"/verify-student/{student_id}", headers=admin_headers
+        )
+        response.raise_for_status()
+
+    async def find_then_update():
+        student = await student_collection.find_one(params, {"_id": 1})
+        if student:
+            await student_collection.update_one(
+                {"_id": student["_id"]}, {"$set": {"is_verified": True}}
+            )
+
+    async def conditional_update():
+        await student_collection.update_one(params, {"$set": {"is_verified": True}})
+
+    return [
+        await measure(
+            "POST /student-signin", min(args.calls, args.slow_calls), signin, warmup=1
+        ),
+        await measure("POST /student-detail", args.calls, student_detail),
+        await measure("PUT /update-profile", args.calls, update_profile),
+        await measure("PUT /upload-marksheets", args.calls, upload_marksheets),
+        await measure("PUT /verify-student/{student_id}", args.calls, verify_student),
+        await measure("find_one then update_one", args.calls, find_then_update),
+        await measure("conditional update_one", args.calls, conditional_update),
+    ]
+
+
+async def blocking_driver(client, args) -> list:
+    """
+    The concurrency gained by the async data layer: --concurrency handlers
+    at once each read a student, through a blocking driver call inside the
+    async handler, as the routers did before, and through the async client.
+    Each read waits --latency-ms longer, standing in for the network to
+    Atlas, which a local server or the stand-in answer too fast to show.
+    """
+    from pymongo import MongoClient
+
+    from app.config import db
+
+    if args.mongo_url:
+        sync_client = MongoClient(args.mongo_url)
+    else:
+        import mongomock
+
+        sync_client = mongomock.MongoClient()
+    sync_collection = sync_client[db.MONGO_DB_NAME]["student_collection"]
+    student = {"student_id": "SSGI20100000", "name": "Student 0"}
+    sync_collection.insert_one(dict(student))
+    await db.student_collection.insert_one(dict(student))
+    latency = args.latency_ms / 1000
+    query = {"student_id": student["student_id"]}
+
+    async def blocking_handler():
+        time.sleep(latency)
+        sync_collection.find_one(query)
+
+    async def async_handler():
+        await asyncio.sleep(latency)
+        await db.student_collection.find_one(query)
+
+    def concurrently(handler):
+        async def call():
+            await asyncio.gather(*(handler() for _ in range(args.concurrency)))
+
+        return call
+
+    detail = f"{args.concurrency} reads at once, {args.latency_ms} ms each"
+    calls = min(args.calls, args.slow_calls)
+    try:
+        return [
+            await measure(
+                "blocking driver in async handler",
+                calls,
+                concurrently(blocking_handler),
+                warmup=1,
+                detail=detail,
+            ),
+            await measure(
+                "async client",
+                calls,
+                concurrently(async_handler),
+                warmup=1,
+                detail=detail,
+            ),
+        ]
+    finally:
+        sync_collection.delete_one(query)
+        await db.student_collection.delete_one(query)
+        sync_client.close()
+
+
+BENCHMARKS = {
+    "blocking_driver": blocking_driver,
+    "verify_token": verify_token,
+    "broadcasts": broadcasts,
+    "eligibility": eligibility,
+    "round_trips": round_trips,
+}
+
+
+def print_results(results: list):
+    print(
+        f"{'benchmark':<44}{'calls':>7}{'mean':>10}{'p50':>10}{'p95':>10}"
+        f"{'db ops':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['benchmark']:<44}{result['calls']:>7}{result['mean_ms']:>10}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}"
+            f"{result['db_ops_per_call']:>8}  {result['detail']}"
+        )
+
+
+async def main(args) -> int:
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    results = []
+    async with open_client(args) as client:
+        operations.install()
+        for name in args.benchmark or list(BENCHMARKS):
+            results.extend(await BENCHMARKS[name](client, args))
+    print_results(results)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument(
+        "--slow-calls",
+        type=int,
+        default=20,
+        help="calls for benchmarks that write or scan every student, or hash",
+    )
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--mongo-url", help="run in-process against this mongod")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="handlers run at once by the blocking_driver benchmark",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=5,
+        help="network latency added to each read by the blocking_driver benchmark",
+    )
+    args = parser.parse_args(argv)
+    args.base_url = None
+    args.admin_id = None
+    args.admin_password = BENCH_ADMIN_PASSWORD
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,99 @@
+"""
+Serialization and compression benchmark for large response bodies.
+
+Builds a get-all-students page of full student documents, the heaviest
+payload the API returns, and compares FastAPI's default rendering
+(jsonable_encoder then json.dumps) with the orjson serializer the app
+uses, reporting CPU time per render and wire bytes for identity, gzip
+and, when the brotli package is installed, br.
+
+    python -m bench.payloads
+    python -m bench.payloads --students 5000 --repeat 20
+"""
+
+import argparse
+import datetime
+import json
+import sys
+import time
+import zlib
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.services import compression
+from app.services.serialization import serialize_response
+from bench.run import _student_details
+
+
+def build_page(students: int) -> dict:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "total_students": students,
+        "next_cursor": None,
+        "all_students": [
+            {
+                "_id": ObjectId(),
+                "student_id": f"SSGI2010{index:04d}",
+                "name": f"Student {index}",
+                "email": f"student{index}@example.com",
+                "phone": "9876543210",
+                "is_verified": True,
+                "created_at": now,
+                **_student_details(index),
+            }
+            for index in range(students)
+        ],
+    }
+
+
+def fastapi_default(page: dict) -> bytes:
+    # What JSONResponse does after FastAPI's jsonable_encoder pass
+    content = jsonable_encoder(page, custom_encoder={ObjectId: str})
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def cpu_ms(func, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return round((time.process_time() - start) / repeat * 1000, 2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    page = build_page(args.students)
+    body = serialize_response(page)
+    print(f"{args.students} students, {len(body)} bytes of JSON\n")
+
+    print(f"{'render':<24}{'cpu ms':>10}")
+    for label, render in (
+        ("jsonable_encoder+json", fastapi_default),
+        ("orjson", serialize_response),
+    ):
+        print(f"{label:<24}{cpu_ms(lambda: render(page), args.repeat):>10}")
+
+    encoders = {"identity": lambda: body}
+    encoders["gzip"] = lambda: zlib.compress(body, compression.GZIP_LEVEL, wbits=31)
+    if compression.brotli is not None:
+        encoders["br"] = lambda: compression.brotli.compress(
+            body, quality=compression.BROTLI_QUALITY
+        )
+    print(f"\n{'encoding':<24}{'cpu ms':>10}{'bytes':>12}{'ratio':>8}")
+    for label, encode in encoders.items():
+        size = len(encode())
+        print(
+            f"{label:<24}{cpu_ms(encode, args.repeat):>10}{size:>12}"
+            f"{size / len(body):>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,817 @@
+"""
+Load-test and benchmark scenarios for the placement API.
+
+By default the app runs in-process on the in-memory Mongo stand-in
+(bench.memory_db) with the local storage backend, so no network or
+credentials are needed. Pass --mongo-url to run it against a local mongod
+instead, or --base-url to drive an already running server. Needs the
+packages in requirements-dev.txt. Simulated users send distinct
+X-Forwarded-For addresses, so a remote server needs
+RATE_LIMIT_TRUST_FORWARDED_FOR=1. In-process runs create their own admin
+at startup; with --base-url pass the --admin-id and --admin-password of an
+existing admin.
+
+    python -m bench.run
+    python -m bench.run --scenario company_browsing --requests 2000
+    python -m bench.run --save-baseline
+    python -m bench.run --mongo-url mongodb://localhost:27017 --threshold 0.15
+
+Each scenario reports throughput and p50/p95/p99 latency per endpoint.
+Results are compared with the stored baseline and the run exits with
+status 1 when any endpoint's p95 is slower than the baseline by more than
+--threshold.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Admin created at startup by in-process runs
+BENCH_ADMIN_EMAIL = "admin@bench.com"
+BENCH_ADMIN_PASSWORD = "bench-admin-password"
+SEMESTERS = 6
+
+
+class Recorder:
+    """
+    Latencies and failures per endpoint label for one scenario.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.elapsed = 0.0
+
+    def record(self, label: str, seconds: float):
+        self.latencies.setdefault(label, []).append(seconds)
+
+    async def call(self, client, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            statuses = self.errors.setdefault(label, {})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        else:
+            self.latencies.setdefault(label, []).append(elapsed)
+        return response
+
+    def summary(self) -> dict:
+        """
+        Throughput and latency percentiles of the successful requests per
+        endpoint; rejected requests (e.g. 503s from the bcrypt pool) are only
+        counted as errors so they do not flatter the percentiles.
+        """
+        results = {}
+        for label in {**self.latencies, **self.errors}:
+            latencies = self.latencies.get(label, [])
+            errors = self.errors.get(label, {})
+            p50, p95, p99 = (
+                np.percentile(latencies, [50, 95, 99]) * 1000
+                if latencies
+                else (np.nan,) * 3
+            )
+            results[label] = {
+                "requests": len(latencies) + sum(errors.values()),
+                "errors": sum(errors.values()),
+                "error_statuses": {str(status): n for status, n in errors.items()},
+                "rps": round(len(latencies) / self.elapsed, 1),
+                "p50_ms": None if np.isnan(p50) else round(float(p50), 2),
+                "p95_ms": None if np.isnan(p95) else round(float(p95), 2),
+                "p99_ms": None if np.isnan(p99) else round(float(p99), 2),
+            }
+        return results
+
+
+class Fixture:
+    """
+    Students, companies and tokens created before the scenarios run.
+    """
+
+    def __init__(self):
+        self.students = []  # (student_id, password, headers)
+        self.admin_headers = None
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _client_address(index: int) -> dict:
+    """
+    A distinct client IP per simulated user, so per-IP rate limits apply to
+    each user separately as they would in production.
+    """
+    return {
+        "X-Forwarded-For": f"10.{index // 62500}.{index // 250 % 250}.{index % 250 + 1}"
+    }
+
+
+def _student_details(index: int) -> dict:
+    rng = random.Random(index)
+    return {
+        "basic_details": {
+            "full_name": f"Student {index}",
+            "father_name": "Father",
+            "mother_name": "Mother",
+            "date_of_birth": "2003-01-01",
+            "branch": rng.choice(["CSE", "IT", "ECE", "ME"]),
+        },
+        "tenth_details": {
+            "school_location": "Bhilai",
+            "percentage": rng.uniform(60, 98),
+            "board": "CBSE",
+            "year_of_passing": 2019,
+        },
+        "twelfth_details": {
+            "school_location": "Bhilai",
+            "percentage": rng.uniform(60, 98),
+            "board": "CBSE",
+            "year_of_passing": 2021,
+        },
+        "semester_details": [
+            {
+                "semester": semester,
+                "cgpa": round(rng.uniform(5, 10), 2),
+                "no_backlogs": rng.choice([0, 0, 0, 1]),
+            }
+            for semester in range(1, SEMESTERS + 1)
+        ],
+    }
+
+
+async def _gather_limited(concurrency: int, coroutines):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(limited(c) for c in coroutines))
+
+
+async def _post_until_accepted(client, url: str, **kwargs):
+    """
+    POST during seeding, waiting out rate limits and 503s from the
+    saturated bcrypt pool.
+    """
+    while True:
+        response = await client.post(url, **kwargs)
+        if response.status_code not in (429, 503):
+            response.raise_for_status()
+            return response
+        await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+
+
+async def admin_login(client, args) -> dict:
+    """
+    Log in as the admin given with --admin-id, or in-process as the
+    bootstrap admin open_client configures.
+
+    Returns:
+        dict: Request headers for the admin.
+    """
+    admin_id = args.admin_id
+    if admin_id is None:
+        from app.config.db import admin_collection
+
+        admin = await admin_collection.find_one({"admin_email": BENCH_ADMIN_EMAIL})
+        admin_id = str(admin["_id"])
+    address = _client_address(args.students)
+    response = await _post_until_accepted(
+        client,
+        "/admin-login",
+        json={"admin_id": admin_id, "admin_password": args.admin_password},
+        headers=address,
+    )
+    return {**_bearer(response.json()["access_token"]), **address}
+
+
+async def seed(client, args) -> Fixture:
+    fixture = Fixture()
+    run_id = uuid.uuid4().hex[:8]
+
+    fixture.admin_headers = await admin_login(client, args)
+
+    async def add_student(index: int):
+        password = f"password-{index}"
+        address = _client_address(index)
+        response = await _post_until_accepted(
+            client,
+            "/student-signin",
+            json={
+                "name": f"Student {index}",
+                "email": f"student{index}-{run_id}@bench.com",
+                "contact": "9876543210",
+                "password": password,
+            },
+            headers=address,
+        )
+        student_id = response.json()["student_id"]
+        response = await _post_until_accepted(
+            client,
+            "/student-login",
+            json={"student_id": student_id, "password": password},
+            headers=address,
+        )
+        headers = {**_bearer(response.json()["access_token"]), **address}
+        response = await client.post(
+            "/student-detail",
+            params={"student_id": student_id},
+            json=_student_details(index),
+            headers=headers,
+        )
+        response.raise_for_status()
+        fixture.students.append((student_id, password, headers))
+
+    await _gather_limited(
+        args.concurrency, (add_student(i) for i in range(args.students))
+    )
+
+    for index in range(args.companies):
+        response = await client.post(
+            "/add-company",
+            json={
+                "name": f"Company {index}",
+                "industry": "Software",
+                "logo": None,
+                "recruitmentDate": f"2026-{index % 12 + 1:02d}-15",
+                "ctc": "10 LPA",
+                "roles": ["SDE"],
+                "status": random.choice(["Upcoming", "Ongoing", "Completed"]),
+                "eligibility": {
+                    "minScore": random.randint(6, 8),
+                    "backlogsAllowed": random.randint(0, 1),
+                },
+                "additionalInfo": None,
+            },
+            headers=fixture.admin_headers,
+        )
+        response.raise_for_status()
+    return fixture
+
+
+async def login_storm(client, fixture, recorder, args):
+    """
+    Many students logging in at once, e.g. when results are announced.
+    bcrypt bound, so it runs a tenth of --requests. Students retry after
+    the Retry-After of a 429 or 503 as the app asks clients to; each attempt
+    is recorded under POST /student-login and the time until the student is
+    logged in under "student login incl. retries".
+    """
+
+    async def login():
+        student_id, password, headers = random.choice(fixture.students)
+        start = time.perf_counter()
+        while True:
+            response = await recorder.call(
+                client,
+                "POST /student-login",
+                "POST",
+                "/student-login",
+                json={"student_id": student_id, "password": password},
+                headers=headers,
+            )
+            if response.status_code not in (429, 503):
+                break
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+        if response.status_code < 400:
+            recorder.record("student login incl. retries", time.perf_counter() - start)
+
+    await _gather_limited(
+        args.concurrency, (login() for _ in range(max(1, args.requests // 10)))
+    )
+
+
+async def profile_edits(client, fixture, recorder, args):
+    """
+    Students updating part of their profile and viewing the result. Semester
+    edits are only sent to a real mongod.
+    """
+
+    async def edit():
+        student_id, _, headers = random.choice(fixture.students)
+        update = {"basic_details": {"father_name": f"Father {random.random()}"}}
+        # The in-memory stand-in does not implement arrayFilters
+        if args.mongo_url or args.base_url:
+            update["semester_details"] = [
+                {
+                    "semester": random.randint(1, SEMESTERS),
+                    "cgpa": round(random.uniform(5, 10), 2),
+                }
+            ]
+        await recorder.call(
+            client,
+            "PUT /update-profile",
+            "PUT",
+            "/update-profile",
+            params={"student_id": student_id},
+            json=update,
+            headers=headers,
+        )
+        for _ in range(3):
+            await recorder.call(
+                client,
+                "GET /view-profile",
+                "GET",
+                "/view-profile",
+                params={"student_id": student_id},
+                headers=headers,
+            )
+
+    await _gather_limited(args.concurrency, (edit() for _ in range(args.requests)))
+
+
+async def company_browsing(client, fixture, recorder, args):
+    """
+    Students browsing and filtering the company list, revalidating with
+    the ETag they were given.
+    """
+    etags = {}
+
+    async def browse():
+        _, _, headers = random.choice(fixture.students)
+        params = random.choice(
+            [
+                {},
+                {"status": "Upcoming"},
+                {"from_date": "2026-03-01", "to_date": "2026-09-30"},
+                {"offset": 0, "limit": 10},
+            ]
+        )
+        key = tuple(sorted(params.items()))
+        if key in etags and random.random() < 0.5:
+            headers = {**headers, "If-None-Match": etags[key]}
+        response = await recorder.call(
+            client,
+            "GET /companies/",
+            "GET",
+            "/companies/",
+            params=params,
+            headers=headers,
+        )
+        if "etag" in response.headers:
+            etags[key] = response.headers["etag"]
+        if random.random() < 0.3:
+            student_id, _, headers = random.choice(fixture.students)
+            await recorder.call(
+                client,
+                "GET /eligible-companies/{student_id}",
+                "GET",
+                f"/eligible-companies/{student_id}",
+                headers=headers,
+            )
+
+    await _gather_limited(args.concurrency, (browse() for _ in range(args.requests)))
+
+
+async def notification_polling(client, fixture, recorder, args):
+    """
+    Students polling their notification feed and marking it read.
+    """
+
+    async def poll():
+        student_id, _, headers = random.choice(fixture.students)
+        await recorder.call(
+            client,
+            "GET /get-notifications/{student_id}",
+            "GET",
+            f"/get-notifications/{student_id}",
+            headers=headers,
+        )
+        if random.random() < 0.1:
+            await recorder.call(
+                client,
+                "PUT /mark-notifications-read/{student_id}",
+                "PUT",
+                f"/mark-notifications-read/{student_id}",
+                headers=headers,
+            )
+
+    await _gather_limited(args.concurrency, (poll() for _ in range(args.requests)))
+
+
+async def broadcasts(client, fixture, recorder, args):
+    """
+    Admins broadcasting and targeting notifications while students poll.
+    """
+
+    async def send():
+        student_id = random.choice(["all", random.choice(fixture.students)[0]])
+        await recorder.call(
+            client,
+            "POST /send-notification",
+            "POST",
+            "/send-notification",
+            json={
+                "message": f"Drive update {uuid.uuid4().hex[:6]}",
+                "student_id": student_id,
+            },
+            headers=fixture.admin_headers,
+        )
+
+    async def poll():
+        student_id, _, headers = random.choice(fixture.students)
+        await recorder.call(
+            client,
+            "GET /get-notifications/{student_id}",
+            "GET",
+            f"/get-notifications/{student_id}",
+            headers=headers,
+        )
+
+    sends = max(1, args.requests // 10)
+    work = [send() for _ in range(sends)] + [poll() for _ in range(args.requests)]
+    random.shuffle(work)
+    await _gather_limited(args.concurrency, work)
+
+
+async def idle_subscribers(client, fixture, recorder, args):
+    """
+    --subscribers push connections held open while admins broadcast and
+    students poll. Reports broadcast latency, the time until each
+    subscriber received each broadcast, and whether polling slows down.
+    In-process the connections are registered on the hub directly, as
+    httpx's ASGI transport cannot stream responses; with --base-url they
+    are real server-sent event streams.
+    """
+    sent_at = {}
+    connected = asyncio.Semaphore(0)
+
+    def received(message: str):
+        if message in sent_at:
+            recorder.record("push delivery", time.perf_counter() - sent_at[message])
+
+    async def subscribe_in_process(student_id: str):
+        from app.services.notification_hub import notification_hub
+
+        queue = notification_hub.subscribe(student_id)
+        connected.release()
+        try:
+            while True:
+                received((await queue.get()).get("message"))
+        finally:
+            notification_hub.unsubscribe(student_id, queue)
+
+    async def subscribe_remote(student_id: str, headers: dict):
+        token = headers["Authorization"].split()[1]
+        async with client.stream(
+            "GET",
+            f"/notifications/stream/{student_id}",
+            params={"access_token": token},
+            headers=headers,
+            timeout=None,
+        ) as response:
+            connected.release()
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    received(json.loads(line[len("data: ") :]).get("message"))
+
+    subscribers = []
+    for index in range(args.subscribers):
+        student_id, _, headers = fixture.students[index % len(fixture.students)]
+        subscribers.append(
+            asyncio.create_task(
+                subscribe_remote(student_id, headers)
+                if args.base_url
+                else subscribe_in_process(student_id)
+            )
+        )
+    for _ in subscribers:
+        await connected.acquire()
+
+    async def send():
+        message = f"Drive update {uuid.uuid4().hex}"
+        sent_at[message] = time.perf_counter()
+        await recorder.call(
+            client,
+            "POST /send-notification all",
+            "POST",
+            "/send-notification",
+            json={"message": message, "student_id": "all"},
+            headers=fixture.admin_headers,
+        )
+
+    async def poll():
+        student_id, _, headers = random.choice(fixture.students)
+        await recorder.call(
+            client,
+            "GET /get-notifications/{student_id}",
+            "GET",
+            f"/get-notifications/{student_id}",
+            headers=headers,
+        )
+
+    sends = max(1, args.requests // 50)
+    work = [send() for _ in range(sends)] + [poll() for _ in range(args.requests)]
+    random.shuffle(work)
+    await _gather_limited(args.concurrency, work)
+
+    # Give the last broadcasts time to reach every connection
+    expected = sends * args.subscribers
+    deadline = time.perf_counter() + 10
+    while (
+        len(recorder.latencies.get("push delivery", [])) < expected
+        and time.perf_counter() < deadline
+    ):
+        await asyncio.sleep(0.05)
+    for subscriber in subscribers:
+        subscriber.cancel()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+    missing = expected - len(recorder.latencies.get("push delivery", []))
+    if missing:
+        recorder.errors["push delivery"] = {"missed": missing}
+
+
+async def admin_listing(client, fixture, recorder, args):
+    """
+    Admins paging through and filtering the student list.
+    """
+
+    async def page():
+        params = random.choice(
+            [
+                {"limit": 50},
+                {"limit": 50, "branch": "CSE"},
+                {"limit": 100, "min_cgpa": 7.5, "fields": "student_id,name,email"},
+            ]
+        )
+        await recorder.call(
+            client,
+            "GET /get-all-students",
+            "GET",
+            "/get-all-students",
+            params=params,
+            headers=fixture.admin_headers,
+        )
+
+    await _gather_limited(args.concurrency, (page() for _ in range(args.requests)))
+
+
+async def abusive_load(client, fixture, recorder, args):
+    """
+    A few clients hammering login and signin with bad credentials while
+    students keep using the app. Normal traffic should keep a stable p99;
+    abusive requests should mostly be turned away with 429s and 503s.
+    """
+    done = asyncio.Event()
+    abusive_addresses = [_client_address(args.students + 1 + i) for i in range(3)]
+
+    async def abuse():
+        while not done.is_set():
+            # Rejections never suspend over the in-process transport, so
+            # yield explicitly as a network round trip would
+            await asyncio.sleep(0)
+            address = random.choice(abusive_addresses)
+            student_id = random.choice(fixture.students)[0]
+            if random.random() < 0.8:
+                await recorder.call(
+                    client,
+                    "abusive POST /student-login",
+                    "POST",
+                    "/student-login",
+                    json={"student_id": student_id, "password": "wrong-password"},
+                    headers=address,
+                )
+            else:
+                await recorder.call(
+                    client,
+                    "abusive POST /student-signin",
+                    "POST",
+                    "/student-signin",
+                    json={
+                        "name": "Spam",
+                        "email": f"spam-{uuid.uuid4().hex}@spam.com",
+                        "contact": "9000000000",
+                        "password": "spam",
+                    },
+                    headers=address,
+                )
+
+    async def use():
+        student_id, password, headers = random.choice(fixture.students)
+        if random.random() < 0.2:
+            await recorder.call(
+                client,
+                "normal POST /student-login",
+                "POST",
+                "/student-login",
+                json={"student_id": student_id, "password": password},
+                headers=headers,
+            )
+        await recorder.call(
+            client,
+            "normal GET /view-profile",
+            "GET",
+            "/view-profile",
+            params={"student_id": student_id},
+            headers=headers,
+        )
+        await recorder.call(
+            client,
+            "normal GET /get-notifications/{student_id}",
+            "GET",
+            f"/get-notifications/{student_id}",
+            headers=headers,
+        )
+
+    async def normal_traffic():
+        await _gather_limited(
+            max(1, args.concurrency // 2), (use() for _ in range(args.requests))
+        )
+        done.set()
+
+    abusers = [abuse() for _ in range(args.concurrency)]
+    await asyncio.gather(normal_traffic(), *abusers)
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "profile_edits": profile_edits,
+    "company_browsing": company_browsing,
+    "notification_polling": notification_polling,
+    "broadcasts": broadcasts,
+    "idle_subscribers": idle_subscribers,
+    "admin_listing": admin_listing,
+    "abusive_load": abusive_load,
+}
+
+
+@contextlib.asynccontextmanager
+async def open_client(args):
+    import httpx
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            yield client
+        return
+
+    # Settings are read at import time, so they must be set before the app loads
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["MONGO_DB_NAME"] = f"pms_bench_{uuid.uuid4().hex[:8]}"
+    os.environ.setdefault("STORAGE_BACKEND", "local")
+    os.environ.setdefault("UPLOAD_SIGNING_SECRET", "bench-upload-signing-secret")
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret")
+    os.environ.setdefault("RATE_LIMIT_TRUST_FORWARDED_FOR", "1")
+    os.environ.setdefault("BOOTSTRAP_ADMIN_EMAIL", BENCH_ADMIN_EMAIL)
+    os.environ.setdefault("BOOTSTRAP_ADMIN_CONTACT", "9999999999")
+    os.environ.setdefault("BOOTSTRAP_ADMIN_PASSWORD", args.admin_password)
+    os.environ.setdefault("LOCAL_STORAGE_ROOT", tempfile.mkdtemp(prefix="pms-bench-"))
+
+    from app.main import app
+
+    if not args.mongo_url:
+        from bench.memory_db import install_memory_client
+
+        install_memory_client()
+
+    # Seeding is bcrypt bound and would log every signin as a slow request
+    logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            yield client
+        if args.mongo_url:
+            from app.config.db import get_client
+
+            await get_client().drop_database(os.environ["MONGO_DB_NAME"])
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float, min_delta_ms: float
+) -> list:
+    regressions = []
+    for scenario, endpoints in results.items():
+        for label, stats in endpoints.items():
+            reference = baseline.get("results", {}).get(scenario, {}).get(label)
+            if not reference or not reference.get("p95_ms") or not stats["p95_ms"]:
+                continue
+            change = stats["p95_ms"] / reference["p95_ms"] - 1
+            delta_ms = stats["p95_ms"] - reference["p95_ms"]
+            if change > threshold and delta_ms > min_delta_ms:
+                regressions.append(
+                    f"{scenario} {label}: p95 {stats['p95_ms']}ms vs "
+                    f"baseline {reference['p95_ms']}ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def print_results(results: dict):
+    header = f"{'endpoint':<44}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    for scenario, endpoints in results.items():
+        print(f"\n{scenario}\n{header}")
+        for label, stats in endpoints.items():
+            print(
+                f"{label:<44}{stats['requests']:>7}{stats['errors']:>6}"
+                f"{stats['rps']:>9}{stats['p50_ms']!s:>9}{stats['p95_ms']!s:>9}"
+                f"{stats['p99_ms']!s:>9}  "
+                + " ".join(f"{k}:{v}" for k, v in stats["error_statuses"].items())
+            )
+
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    scenarios = args.scenario or list(SCENARIOS)
+    results = {}
+    async with open_client(args) as client:
+        fixture = await seed(client, args)
+        for name in scenarios:
+            recorder = Recorder()
+            start = time.perf_counter()
+            await SCENARIOS[name](client, fixture, recorder, args)
+            recorder.elapsed = time.perf_counter() - start
+            results[name] = recorder.summary()
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "environment": {
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "cpus": os.cpu_count(),
+                        "backend": args.base_url
+                        or ("mongo" if args.mongo_url else "memory"),
+                        "students": args.students,
+                        "requests": args.requests,
+                        "concurrency": args.concurrency,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare against; run with --save-baseline")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo p95 regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--subscribers",
+        type=int,
+        default=2000,
+        help="open push connections in the idle_subscribers scenario",
+    )
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--base-url", help="benchmark a running server instead")
+    parser.add_argument("--mongo-url", help="run in-process against this mongod")
+    parser.add_argument("--admin-id", help="admin to log in as with --base-url")
+    parser.add_argument("--admin-password", default=BENCH_ADMIN_PASSWORD)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed p95 slowdown against the baseline (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="ignore p95 slowdowns smaller than this, which are mostly noise",
+    )
+    args = parser.parse_args(argv)
+    if args.base_url and not args.admin_id:
+        parser.error("--base-url needs --admin-id")
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# Settings are read at import time, so they are set before the app loads
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret")
+os.environ.setdefault("UPLOAD_SIGNING_SECRET", "test-upload-signing-secret")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", tempfile.mkdtemp(prefix="pms-tests-"))
+
+from bench.memory_db import install_memory_client
+
+# Tests that need a real server (query plans, arrayFilters) run against this
+MONGO_TEST_URL = os.getenv("MONGO_TEST_URL", "mongodb://localhost:27017")
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """
+    Give every test its own empty in-memory database.
+    """
+    install_memory_client()
+    yield
+
+
+@pytest.fixture
+def mongod_url():
+    """
+    MONGO_TEST_URL, skipping the test when no mongod answers there.
+    """
+    client = MongoClient(MONGO_TEST_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"no mongod at {MONGO_TEST_URL}")
+    finally:
+        client.close()
+    return MONGO_TEST_URL
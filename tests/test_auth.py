@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+
+from app.services.auth import issue_tokens
+
+
+def test_refresh_tokens_can_only_be_used_once():
+    from app.main import app
+
+    refresh_token = issue_tokens("student", "SSGI20100001")["refresh_token"]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            first = await client.post(
+                "/refresh-token", json={"refresh_token": refresh_token}
+            )
+            replayed = await client.post(
+                "/refresh-token", json={"refresh_token": refresh_token}
+            )
+            rotated = await client.post(
+                "/refresh-token", json={"refresh_token": first.json()["refresh_token"]}
+            )
+        return first, replayed, rotated
+
+    first, replayed, rotated = asyncio.run(run())
+    assert first.status_code == 200
+    assert replayed.status_code == 401
+    assert replayed.json()["detail"] == "Token has been revoked"
+    assert rotated.status_code == 200
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from app.config import db
+from app.services.company_snapshot import CompanySnapshot, etag_matches
+
+
+def test_etag_matches_weak_and_listed_tags():
+    etag = '"abc-123"'
+    assert etag_matches('"abc-123"', etag)
+    assert etag_matches('W/"abc-123"', etag)
+    assert etag_matches('"other", W/"abc-123"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches("", etag)
+
+
+def test_version_and_etag_depend_only_on_content():
+    async def run():
+        await db.companies_collection.insert_one(
+            {"name": "Acme", "recruitmentDate": "2026-01-15", "status": "Upcoming"}
+        )
+        first, second = CompanySnapshot(), CompanySnapshot()
+        await first.refresh()
+        await second.refresh()
+        pages = [first.page(), second.page()]
+
+        # A rebuild that finds the same data keeps the same version
+        first.invalidate()
+        await first.refresh()
+        pages.append(first.page())
+
+        await db.companies_collection.insert_one(
+            {"name": "Globex", "recruitmentDate": "2026-02-15", "status": "Upcoming"}
+        )
+        first.invalidate()
+        await first.refresh()
+        pages.append(first.page())
+        return pages
+
+    (body_a, etag_a), (body_b, etag_b), (body_c, etag_c), (body_d, etag_d) = (
+        asyncio.run(run())
+    )
+    assert body_a == body_b == body_c and etag_a == etag_b == etag_c
+    assert etag_d != etag_a
+    assert json.loads(body_d)["version"] != json.loads(body_a)["version"]
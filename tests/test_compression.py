@@ -0,0 +1,54 @@
+import asyncio
+import gzip
+
+from app.services.compression import CompressionMiddleware
+
+BODY = b'{"companies": []}' * 200
+
+
+async def app(scope, receive, send):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(BODY)).encode()),
+                (b"etag", b'"abc123"'),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def get(accept_encoding: bytes) -> tuple:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/companies/",
+        "headers": [(b"accept-encoding", accept_encoding)],
+    }
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+    return dict(messages[0]["headers"]), messages[1]["body"]
+
+
+def test_compressed_responses_get_a_weak_etag():
+    headers, body = get(b"gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"etag"] == b'W/"abc123"'
+    assert gzip.decompress(body) == BODY
+
+
+def test_identity_responses_keep_the_strong_etag():
+    headers, body = get(b"identity")
+    assert b"content-encoding" not in headers
+    assert headers[b"etag"] == b'"abc123"'
+    assert body == BODY
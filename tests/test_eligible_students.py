@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+from bson import ObjectId
+
+from app.config import db
+from app.services.auth import issue_tokens
+
+
+def test_eligible_students_are_paged_by_average_cgpa():
+    from app.main import app
+
+    headers = {
+        "Authorization": "Bearer "
+        + issue_tokens("admin", str(ObjectId()))["access_token"]
+    }
+    # Ties on the average CGPA are split across pages by _id
+    summaries = [(9.0, 0), (8.5, 1), (8.5, 0), (8.5, 0), (8.5, 1), (7.25, 0)]
+    summaries += [(6.0, 0), (9.5, 2)]
+
+    async def run():
+        company = await db.companies_collection.insert_one(
+            {"name": "Acme", "eligibility": {"minScore": 7, "backlogsAllowed": 1}}
+        )
+        await db.student_collection.insert_many(
+            [
+                {
+                    "student_id": f"SSGI20{100000 + index}",
+                    "academic_summary": {
+                        "average_cgpa": average_cgpa,
+                        "total_backlogs": total_backlogs,
+                    },
+                }
+                for index, (average_cgpa, total_backlogs) in enumerate(summaries)
+            ]
+        )
+        url = f"/companies/{company.inserted_id}/eligible-students"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            pages = []
+            params = {"limit": 2, "include_total": True}
+            while True:
+                response = await client.get(url, params=params, headers=headers)
+                assert response.status_code == 200, response.text
+                pages.append(response.json())
+                if pages[-1]["next_cursor"] is None:
+                    break
+                params = {"limit": 2, "after": pages[-1]["next_cursor"]}
+            invalid = await client.get(
+                url, params={"after": "not-a-cursor"}, headers=headers
+            )
+        return pages, invalid
+
+    pages, invalid = asyncio.run(run())
+    assert pages[0]["total_eligible"] == 6
+    assert all("total_eligible" not in page for page in pages[1:])
+    assert [
+        student["student_id"] for page in pages for student in page["students"]
+    ] == [
+        "SSGI20100000",
+        "SSGI20100001",
+        "SSGI20100002",
+        "SSGI20100003",
+        "SSGI20100004",
+        "SSGI20100005",
+    ]
+    assert invalid.status_code == 400
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import uuid
+
+from pymongo import AsyncMongoClient
+
+from app.config import db
+from app.config.indexes import ensure_indexes, find_collection_scans
+
+
+def test_router_queries_use_indexes(mongod_url, monkeypatch):
+    monkeypatch.setattr(db, "MONGO_DB_NAME", f"pms_test_{uuid.uuid4().hex[:8]}")
+
+    async def run():
+        client = AsyncMongoClient(mongod_url)
+        db.set_client(client)
+        try:
+            assert await ensure_indexes() == []
+            return await find_collection_scans()
+        finally:
+            await client.drop_database(db.MONGO_DB_NAME)
+            await client.close()
+
+    assert asyncio.run(run()) == []
+
+
+def test_unique_index_violated_by_existing_data_is_skipped(caplog):
+    async def run():
+        await db.student_collection.insert_many(
+            [
+                {"student_id": "SSGI20100001", "email": "same@example.com"},
+                {"student_id": "SSGI20100002", "email": "same@example.com"},
+            ]
+        )
+        skipped = await ensure_indexes()
+        return skipped, await db.student_collection.index_information()
+
+    with caplog.at_level(logging.ERROR, logger="app.indexes"):
+        skipped, indexes = asyncio.run(run())
+
+    assert skipped == [("student_collection", "email_unique")]
+    assert "email_unique" not in indexes
+    assert "student_id_unique" in indexes
+    assert "same@example.com" in caplog.text
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.services import notification_hub as hub_module
+from app.services.notification_hub import (
+    RESYNC_EVENT,
+    ChangeStreamNotificationHub,
+    format_event,
+)
+
+
+class FakeChangeStream:
+    def __init__(self, changes, error):
+        self.changes = changes
+        self.error = error
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for token, document in self.changes:
+            self.resume_token = token
+            yield {"fullDocument": document}
+        await asyncio.sleep(0)
+        raise self.error
+
+
+class FakeCollection:
+    """
+    Serves one scripted change stream per watch() call and records the
+    resume token each was opened with.
+    """
+
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.resumed_after = []
+
+    async def watch(self, pipeline, resume_after=None):
+        self.resumed_after.append(resume_after)
+        if not self.streams:
+            await asyncio.Event().wait()
+        return self.streams.pop(0)
+
+
+def run_hub(monkeypatch, streams, subscriber="SSGI20100001"):
+    collection = FakeCollection(streams)
+    monkeypatch.setattr(hub_module, "notifications_collection", collection)
+    monkeypatch.setattr(hub_module, "CHANGE_STREAM_RETRY_SECONDS", 0)
+
+    async def run():
+        hub = ChangeStreamNotificationHub()
+        queue = hub.subscribe(subscriber)
+        await hub.start()
+        while collection.streams:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        await hub.stop()
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        return events
+
+    return collection, asyncio.run(run())
+
+
+def test_watch_resumes_from_last_token_after_failure(monkeypatch):
+    first = {"student_id": "all", "message": "first"}
+    second = {"student_id": "all", "message": "second"}
+    collection, events = run_hub(
+        monkeypatch,
+        [
+            FakeChangeStream([("token-1", first)], AutoReconnect("failover")),
+            FakeChangeStream([("token-2", second)], AutoReconnect("network")),
+        ],
+    )
+    assert collection.resumed_after == [None, "token-1", "token-2"]
+    assert events == [first, second]
+
+
+def test_watch_restarts_and_resyncs_when_history_is_lost(monkeypatch):
+    first = {"student_id": "all", "message": "first"}
+    collection, events = run_hub(
+        monkeypatch,
+        [
+            FakeChangeStream([("token-1", first)], AutoReconnect("failover")),
+            FakeChangeStream([], OperationFailure("history lost", code=286)),
+        ],
+    )
+    assert collection.resumed_after == [None, "token-1", None]
+    assert events == [first, RESYNC_EVENT]
+
+
+def test_events_are_encoded_like_rest_responses():
+    notification_id = ObjectId()
+    event = format_event(
+        {
+            "_id": notification_id,
+            "message": "Drive on Monday",
+            "timestamp": datetime(2026, 10, 17, 9, 30),
+        }
+    )
+    assert event == (
+        'data: {"type":"notification",'
+        f'"notification_id":"{notification_id}",'
+        '"message":"Drive on Monday","timestamp":"2026-10-17T09:30:00"}\n\n'
+    )
+    assert format_event(RESYNC_EVENT) == (
+        'data: {"type":"resync","notification_id":null,'
+        '"message":null,"timestamp":null}\n\n'
+    )
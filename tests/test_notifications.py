@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.config import db
+from app.services.auth import issue_tokens
+
+STUDENT_ID = "SSGI20100001"
+
+
+def test_pages_split_notifications_sharing_a_timestamp():
+    from app.main import app
+
+    sent_at = datetime(2026, 10, 17, 9, 30)
+    # Seven notifications, four of them broadcast in the same millisecond
+    timestamps = [sent_at + timedelta(minutes=1)] + [sent_at] * 4
+    timestamps += [sent_at - timedelta(minutes=1)] * 2
+    headers = {
+        "Authorization": "Bearer " + issue_tokens("student", STUDENT_ID)["access_token"]
+    }
+
+    async def run():
+        await db.notifications_collection.insert_many(
+            [
+                {
+                    "student_id": "all" if index % 2 else STUDENT_ID,
+                    "message": f"Notification {index}",
+                    "timestamp": timestamp,
+                }
+                for index, timestamp in enumerate(timestamps)
+            ]
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            pages = []
+            params = {"limit": 3}
+            while True:
+                response = await client.get(
+                    f"/get-notifications/{STUDENT_ID}", params=params, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                pages.append(response.json())
+                if pages[-1]["next_before"] is None:
+                    break
+                params["before"] = pages[-1]["next_before"]
+            invalid = await client.get(
+                f"/get-notifications/{STUDENT_ID}",
+                params={"before": sent_at.isoformat()},
+                headers=headers,
+            )
+        return pages, invalid
+
+    pages, invalid = asyncio.run(run())
+    assert [len(page["notifications"]) for page in pages] == [3, 3, 1]
+    messages = [
+        notification["message"]
+        for page in pages
+        for notification in page["notifications"]
+    ]
+    assert sorted(messages) == sorted(f"Notification {i}" for i in range(7))
+    assert invalid.status_code == 400
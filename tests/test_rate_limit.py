@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+from passlib.context import CryptContext
+
+from app.config import db
+from app.services import password_service, rate_limit
+from app.services.rate_limit import (
+    AUTH_BURST,
+    UPLOAD_BURST,
+    InMemoryRateLimiter,
+    UploadLimitMiddleware,
+)
+
+
+def test_wrong_passwords_are_limited_per_account(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(rate_limit, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUST_FORWARDED_FOR", True)
+    monkeypatch.setattr(
+        password_service,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], bcrypt__rounds=4),
+    )
+
+    async def login(client, student_id: str, password: str, index: int) -> int:
+        # Every attempt comes from a different address
+        response = await client.post(
+            "/student-login",
+            json={"student_id": student_id, "password": password},
+            headers={"X-Forwarded-For": f"10.0.{index // 250}.{index % 250 + 1}"},
+        )
+        return response.status_code
+
+    async def run():
+        await db.student_collection.insert_many(
+            [
+                {
+                    "student_id": student_id,
+                    "password": await password_service.hash_password("secret"),
+                }
+                for student_id in ("SSGI20100001", "SSGI20100002")
+            ]
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            attempts = iter(range(1000))
+            logins = [
+                await login(client, "SSGI20100001", "secret", next(attempts))
+                for _ in range(AUTH_BURST + 2)
+            ]
+            unknown = [
+                await login(client, "SSGI20199999", "guess", next(attempts))
+                for _ in range(AUTH_BURST + 2)
+            ]
+            guesses = [
+                await login(client, "SSGI20100001", "guess", next(attempts))
+                for _ in range(AUTH_BURST + 2)
+            ]
+            other_account = await login(
+                client, "SSGI20100002", "secret", next(attempts)
+            )
+        return logins, unknown, guesses, other_account
+
+    logins, unknown, guesses, other_account = asyncio.run(run())
+    # Naming an account, or logging into it, never locks it
+    assert logins == [200] * (AUTH_BURST + 2)
+    assert unknown == [404] * (AUTH_BURST + 2)
+    assert guesses == [401] * AUTH_BURST + [429, 429]
+    assert other_account == 200
+
+
+def test_uploads_are_rejected_before_the_body_is_read(monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limiter", InMemoryRateLimiter())
+    body_reads = 0
+
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        nonlocal body_reads
+        body_reads += 1
+        return {"type": "http.request", "body": b"x" * 1024, "more_body": False}
+
+    async def run():
+        middleware = UploadLimitMiddleware(app, paths=["/companies/{company_id}/logo"])
+        statuses = []
+        for _ in range(UPLOAD_BURST + 1):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {
+                "type": "http",
+                "method": "PUT",
+                "path": "/companies/abc/logo",
+                "headers": [],
+                "client": ("10.0.0.1", 1234),
+            }
+            await middleware(scope, receive, send)
+            statuses.append(messages[0]["status"])
+        return statuses
+
+    statuses = asyncio.run(run())
+    assert statuses == [200] * UPLOAD_BURST + [429]
+    assert body_reads == UPLOAD_BURST
@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.storage import CloudinaryStorage
+
+FOLDER = "MinorProject/10th"
+PUBLIC_ID = "0123456789abcdef"
+
+
+@pytest.fixture
+def cloudinary_storage(monkeypatch):
+    monkeypatch.setenv("CLOUDINARY_CLOUD_NAME", "pms")
+    monkeypatch.setenv("CLOUDINARY_API_KEY", "key")
+    monkeypatch.setenv("CLOUDINARY_API_SECRET", "secret")
+    return CloudinaryStorage()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"https://res.cloudinary.com/pms/image/upload/v1712345678/{FOLDER}/{PUBLIC_ID}.pdf",
+        f"https://res.cloudinary.com/pms/raw/upload/{FOLDER}/{PUBLIC_ID}",
+    ],
+)
+def test_cloudinary_owns_its_delivery_urls(cloudinary_storage, url):
+    assert cloudinary_storage.owns_url(url, FOLDER, PUBLIC_ID)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        # Another account's cloud
+        f"https://res.cloudinary.com/other/image/upload/v1/{FOLDER}/{PUBLIC_ID}.pdf",
+        # The expected path buried inside a longer one
+        f"https://res.cloudinary.com/pms/image/upload/v1/evil/{FOLDER}/{PUBLIC_ID}.pdf",
+        f"https://res.cloudinary.com/pms/image/upload/v1/{FOLDER}/{PUBLIC_ID}/x.pdf",
+        f"https://res.cloudinary.com/pms/image/upload/v1/{FOLDER}/{PUBLIC_ID}x.pdf",
+        # Transformations or a different delivery type
+        f"https://res.cloudinary.com/pms/image/upload/w_10/{FOLDER}/{PUBLIC_ID}.pdf",
+        f"https://res.cloudinary.com/pms/image/fetch/{FOLDER}/{PUBLIC_ID}.pdf",
+        # Another host, scheme, or extra parts
+        f"https://res.cloudinary.com.evil.com/pms/image/upload/{FOLDER}/{PUBLIC_ID}",
+        f"http://res.cloudinary.com/pms/image/upload/{FOLDER}/{PUBLIC_ID}",
+        f"https://res.cloudinary.com/pms/image/upload/{FOLDER}/{PUBLIC_ID}?x=1",
+        f"https://res.cloudinary.com/pms/image/upload/{FOLDER}/{PUBLIC_ID}.a.pdf",
+        "https://res.cloudinary.com/pms",
+    ],
+)
+def test_cloudinary_rejects_other_urls(cloudinary_storage, url):
+    assert not cloudinary_storage.owns_url(url, FOLDER, PUBLIC_ID)
@@ -0,0 +1,71 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from app.services import student_export
+from bench.run import _student_details
+
+PROJECTION = {
+    "student_id": 1,
+    "name": 1,
+    "email": 1,
+    "basic_details": 1,
+    "tenth_details": 1,
+    "twelfth_details": 1,
+    "semester_details": 1,
+}
+
+
+def synthetic_cursor(rows: int):
+    def cursor(query: dict, projection: dict):
+        async def students():
+            for index in range(rows):
+                yield {
+                    "student_id": f"SSGI20{100000 + index}",
+                    "name": f"Student {index}",
+                    "email": f"student{index}@example.com",
+                    **_student_details(index),
+                }
+
+        return students()
+
+    return cursor
+
+
+def export_peak(monkeypatch, file_format: str, rows: int) -> tuple:
+    """
+    Peak traced memory while draining an export of `rows` students, with
+    each chunk discarded as a client would consume it.
+    """
+    monkeypatch.setattr(student_export, "_student_cursor", synthetic_cursor(rows))
+
+    async def drain():
+        size = 0
+        async for chunk in student_export.stream_students({}, PROJECTION, file_format):
+            size += len(chunk)
+        return size
+
+    tracemalloc.start()
+    try:
+        size = asyncio.run(drain())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, peak
+
+
+@pytest.mark.parametrize(
+    "file_format, rows", [("csv", 500), ("ndjson", 500), ("xlsx", 200)]
+)
+def test_export_peak_memory_does_not_grow_with_rows(monkeypatch, file_format, rows):
+    # Warm up, so modules imported on first use (openpyxl) are not counted
+    export_peak(monkeypatch, file_format, 10)
+    small_size, small_peak = export_peak(monkeypatch, file_format, rows)
+    large_size, large_peak = export_peak(monkeypatch, file_format, rows * 10)
+
+    assert large_size > 5 * small_size
+    # Ten times the rows may cost a little more (allocator noise, openpyxl's
+    # shared state), but nowhere near ten times the memory
+    assert large_peak < 2 * small_peak
+    assert large_peak < 4 * 1024 * 1024
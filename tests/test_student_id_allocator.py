@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+from passlib.context import CryptContext
+
+from app.config import db
+from app.services import password_service, rate_limit
+from app.services.student_id_allocator import (
+    STUDENT_ID_CAPACITY,
+    StudentIdAllocator,
+    student_id_allocator,
+)
+
+
+def test_parallel_allocation_across_workers_is_unique():
+    # Several allocators sharing one counter stand in for uvicorn workers
+    workers = [StudentIdAllocator(block_size=7) for _ in range(4)]
+
+    async def run():
+        return await asyncio.gather(
+            *(workers[i % len(workers)].allocate() for i in range(100000))
+        )
+
+    student_ids = asyncio.run(run())
+    assert len(set(student_ids)) == 100000
+    assert all(len(student_id) == 12 for student_id in student_ids)
+
+
+def test_allocation_stops_when_the_id_range_is_used_up():
+    async def run():
+        await db.counters_collection.insert_one(
+            {"_id": "student_id", "value": STUDENT_ID_CAPACITY - 2}
+        )
+        allocator = StudentIdAllocator(block_size=2)
+        student_ids = [await allocator.allocate() for _ in range(2)]
+        with pytest.raises(RuntimeError, match="student IDs have been allocated"):
+            await allocator.allocate()
+        return student_ids
+
+    assert asyncio.run(run()) == ["SSGI20999998", "SSGI20999999"]
+
+
+def test_parallel_registration_has_no_duplicate_ids(monkeypatch):
+    from app.main import app
+
+    # Cheap hashes and no admission limits, so only ID allocation is tested
+    monkeypatch.setattr(
+        password_service,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], bcrypt__rounds=4),
+    )
+    monkeypatch.setattr(password_service, "PASSWORD_HASH_MAX_PENDING", 10000)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(student_id_allocator, "_next", 0)
+    monkeypatch.setattr(student_id_allocator, "_end", 0)
+    monkeypatch.setattr(student_id_allocator, "block_size", 3)
+
+    async def register(client, index: int) -> str:
+        response = await client.post(
+            "/student-signin",
+            json={
+                "name": f"Student {index}",
+                "email": f"student{index}@example.com",
+                "contact": "9876543210",
+                "password": "password",
+            },
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["student_id"]
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                student_ids = await asyncio.gather(
+                    *(register(client, i) for i in range(60))
+                )
+            stored = await db.student_collection.distinct("student_id")
+        return student_ids, stored
+
+    student_ids, stored = asyncio.run(run())
+    assert len(set(student_ids)) == 60
+    assert sorted(stored) == sorted(student_ids)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.config import db
+from app.services import password_service, student_import
+from app.services.student_id_allocator import student_id_allocator
+from app.services.student_import import StudentImport
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    monkeypatch.setattr(
+        password_service,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], bcrypt__rounds=4),
+    )
+
+
+async def csv_stream(rows: int):
+    yield b"name,email,contact,password\n"
+    for index in range(rows):
+        yield f"Student {index},s{index}@example.com,9876543210,password\n".encode()
+
+
+def test_waiting_hashes_queue_while_interactive_ones_are_rejected(monkeypatch):
+    monkeypatch.setattr(password_service, "PASSWORD_HASH_MAX_PENDING", 1)
+
+    async def run():
+        background = [
+            asyncio.ensure_future(password_service.hash_password("secret", wait=True))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await password_service.hash_password("secret")
+        return rejected.value.status_code, await asyncio.gather(*background)
+
+    status_code, hashes = asyncio.run(run())
+    assert status_code == 503
+    assert len(hashes) == 5
+
+
+def test_import_waits_for_a_saturated_hash_pool(monkeypatch):
+    monkeypatch.setattr(password_service, "PASSWORD_HASH_MAX_PENDING", 1)
+    monkeypatch.setattr(student_import, "PASSWORD_HASH_WORKERS", 4)
+
+    result = asyncio.run(StudentImport().run(csv_stream(20), "csv"))
+    assert result == {"imported": 20, "failed": 0, "errors": []}
+
+
+def test_rows_colliding_with_legacy_ids_get_fresh_ids(monkeypatch):
+    # Legacy students were given random numbers from the allocator's range
+    monkeypatch.setattr(student_id_allocator, "_next", 0)
+    monkeypatch.setattr(student_id_allocator, "_end", 0)
+    legacy_ids = ["SSGI20100000", "SSGI20100002"]
+
+    async def run():
+        await db.student_collection.create_index("student_id", unique=True)
+        await db.student_collection.create_index("email", unique=True)
+        await db.student_collection.insert_many(
+            [
+                {"student_id": legacy_ids[0], "email": "legacy0@example.com"},
+                {"student_id": legacy_ids[1], "email": "s3@example.com"},
+            ]
+        )
+        importer = StudentImport()
+        result = await importer.run(csv_stream(4), "csv")
+        return result, importer.student_ids
+
+    result, student_ids = asyncio.run(run())
+    assert result["imported"] == 3
+    assert result["errors"] == [{"row": 4, "error": "Duplicate email"}]
+    assert len(set(student_ids)) == 3
+    assert not set(student_ids) & set(legacy_ids)
@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+
+import httpx
+from pymongo import AsyncMongoClient
+
+from app.config import db
+from app.models.pms_model import UpdateProfile
+from app.router.pms_router import flatten_profile_update
+from app.services.auth import issue_tokens
+
+STUDENT_ID = "SSGI20100001"
+
+
+def update_profile(students: list, updates: list, mongod_url: str = None) -> tuple:
+    """
+    Store the students, send each update for STUDENT_ID and return the
+    response status codes and each student's semester list, against a
+    scratch database on mongod_url when given.
+    """
+    from app.main import app
+
+    headers = {
+        "Authorization": "Bearer " + issue_tokens("student", STUDENT_ID)["access_token"]
+    }
+
+    async def run():
+        if mongod_url is None:
+            return await send()
+        client = AsyncMongoClient(mongod_url)
+        db.set_client(client)
+        try:
+            return await send()
+        finally:
+            await client.drop_database(db.MONGO_DB_NAME)
+            await client.close()
+
+    async def send():
+        await db.student_collection.insert_many(students)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            statuses = [
+                (
+                    await client.put(
+                        "/update-profile",
+                        params={"student_id": STUDENT_ID},
+                        json=update,
+                        headers=headers,
+                    )
+                ).status_code
+                for update in updates
+            ]
+        stored = await db.student_collection.find(
+            {}, {"_id": 0, "student_id": 1, "semester_details": 1}
+        ).to_list(None)
+        return statuses, {
+            student["student_id"]: student.get("semester_details") for student in stored
+        }
+
+    return asyncio.run(run())
+
+
+def test_semesters_sent_twice_get_one_array_filter():
+    set_fields, array_filters, semester_updates = flatten_profile_update(
+        UpdateProfile(
+            semester_details=[
+                {"semester": 2, "cgpa": 7.5},
+                {"semester": 2, "cgpa": 8.0, "no_backlogs": 0},
+            ]
+        )
+    )
+
+    assert array_filters == [{"sem2.semester": 2}]
+    assert set_fields == {
+        "semester_details.$[sem2].cgpa": 8.0,
+        "semester_details.$[sem2].no_backlogs": 0,
+    }
+    assert semester_updates == {2: {"semester": 2, "cgpa": 8.0, "no_backlogs": 0}}
+
+
+def test_semester_numbers_below_one_are_rejected():
+    statuses, _ = update_profile(
+        [{"student_id": STUDENT_ID, "semester_details": []}],
+        [
+            {"semester_details": [{"semester": 0, "cgpa": 8.0}]},
+            {"semester_details": [{"semester": -1, "cgpa": 8.0}]},
+        ],
+    )
+    assert statuses == [422, 422]
+
+
+def test_semester_updates_on_mongod(mongod_url, monkeypatch):
+    # mongomock has no arrayFilters, so this path only runs against a mongod
+    monkeypatch.setattr(db, "MONGO_DB_NAME", f"pms_test_{uuid.uuid4().hex[:8]}")
+    statuses, stored = update_profile(
+        [
+            {
+                "student_id": STUDENT_ID,
+                "semester_details": [
+                    {"semester": 1, "cgpa": 7.0, "no_backlogs": 1},
+                    {"semester": 2, "cgpa": 7.5, "no_backlogs": 0},
+                ],
+            },
+            {"student_id": "SSGI20100002"},
+        ],
+        [
+            {
+                "semester_details": [
+                    {"semester": 1, "cgpa": 8.0},
+                    {"semester": 1, "no_backlogs": 0},
+                    {"semester": 3, "cgpa": 9.0, "no_backlogs": 0},
+                ]
+            }
+        ],
+        mongod_url,
+    )
+
+    assert statuses == [200]
+    assert stored[STUDENT_ID] == [
+        {"semester": 1, "cgpa": 8.0, "no_backlogs": 0},
+        {"semester": 2, "cgpa": 7.5, "no_backlogs": 0},
+        {"semester": 3, "cgpa": 9.0, "no_backlogs": 0},
+    ]
+    assert stored["SSGI20100002"] is None
+
+
+def test_first_semesters_replace_a_missing_array_on_mongod(mongod_url, monkeypatch):
+    monkeypatch.setattr(db, "MONGO_DB_NAME", f"pms_test_{uuid.uuid4().hex[:8]}")
+    statuses, stored = update_profile(
+        [{"student_id": STUDENT_ID, "basic_details": {"full_name": "A"}}],
+        [
+            {
+                "basic_details": {"branch": "CSE"},
+                "semester_details": [{"semester": 1, "cgpa": 8.0}],
+            }
+        ],
+        mongod_url,
+    )
+
+    assert statuses == [200]
+    assert stored[STUDENT_ID] == [{"semester": 1, "cgpa": 8.0}]
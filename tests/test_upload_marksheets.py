@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import httpx
+
+from app.config import db
+from app.services import storage
+from app.services.auth import issue_tokens
+
+STUDENT_ID = "SSGI20100001"
+
+
+def test_failed_and_timed_out_uploads_do_not_discard_the_others(monkeypatch):
+    from app.main import app
+
+    def upload(file, folder, resource_type="auto", timeout=None):
+        name = file.read().decode()
+        if name == "fail":
+            raise RuntimeError("storage rejected the file")
+        if name == "slow":
+            time.sleep(0.5)
+        return f"/uploads/{folder}/{name}"
+
+    monkeypatch.setattr(storage.storage, "upload", upload)
+    monkeypatch.setattr(storage, "UPLOAD_TIMEOUT_SECONDS", 0.1)
+    headers = {
+        "Authorization": "Bearer " + issue_tokens("student", STUDENT_ID)["access_token"]
+    }
+
+    async def run():
+        await db.student_collection.insert_one({"student_id": STUDENT_ID})
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.put(
+                "/upload-marksheets",
+                params={"student_id": STUDENT_ID},
+                files=[
+                    ("tenth_marksheet", ("10th.pdf", b"tenth")),
+                    ("twelfth_marksheet", ("12th.pdf", b"fail")),
+                    ("semester_marksheets", ("sem1.pdf", b"slow")),
+                    ("semester_marksheets", ("sem2.pdf", b"sem2")),
+                ],
+                headers=headers,
+            )
+        # The timed-out upload keeps its slot until its thread returns
+        held_slots = storage.UPLOAD_CONCURRENCY - storage._upload_semaphore._value
+        await asyncio.sleep(0.6)
+        freed_slots = storage.UPLOAD_CONCURRENCY - storage._upload_semaphore._value
+        student = await db.student_collection.find_one({"student_id": STUDENT_ID})
+        return response, held_slots, freed_slots, student
+
+    response, held_slots, freed_slots, student = asyncio.run(run())
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Some marksheets failed to upload"
+    assert body["marksheet_urls"] == {
+        "tenth_marksheet_url": "/uploads/MinorProject/10th/tenth",
+        "twelfth_marksheet_url": None,
+        "semester_marksheets_urls": [None, "/uploads/MinorProject/Semesters/sem2"],
+    }
+    assert body["failed_uploads"] == [
+        {
+            "field": "twelfth_details.marksheet_url",
+            "filename": "12th.pdf",
+            "error": "storage rejected the file",
+        },
+        {
+            "field": "semester_details.0.marksheet_url",
+            "filename": "sem1.pdf",
+            "error": "TimeoutError",
+        },
+    ]
+    assert (
+        student["tenth_details"]["marksheet_url"]
+        == body["marksheet_urls"]["tenth_marksheet_url"]
+    )
+    assert "marksheet_url" not in student.get("twelfth_details", {})
+    assert (held_slots, freed_slots) == (1, 0)